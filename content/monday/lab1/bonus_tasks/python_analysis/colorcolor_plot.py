@@ -5,28 +5,48 @@ Creates comprehensive color-color diagrams showcasing different photometric syst
 """
 
 import os
+import functools
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
+import pandas as pd
+from mesa_figures import HEADLESS, PNG_KWARGS
+
 import matplotlib.pyplot as plt
-import mesa_reader as mr
 import matplotlib.gridspec as gridspec
 import glob
 from matplotlib.patches import Rectangle
 from matplotlib.collections import LineCollection
+from mesa_runs import find_run_dirs, parse_run_name
+from mesa_cache import HistoryData
 
-def read_header_columns(history_file):
-    """Read column headers from history file to find available filters."""
-    header_line = None
-    with open(history_file, "r") as fp:
-        for line in fp:
-            if "model_number" in line:
-                header_line = line.strip()
-                break
-    
-    if header_line is None:
-        return [], []
-    
-    all_cols = header_line.split()
+# Upper bound on points per evolutionary-track scatter
+MAX_SCATTER_POINTS = 5000
+
+_plots_dir_ready = False
+
+def _ensure_plots_dir():
+    """Create the plots/ output directory on first use."""
+    global _plots_dir_ready
+    if not _plots_dir_ready:
+        os.makedirs("plots", exist_ok=True)
+        _plots_dir_ready = True
+
+def _save_figure(fig, filename):
+    """Save a figure to filename at the standard 300 dpi."""
+    _ensure_plots_dir()
+    fig.savefig(filename, dpi=300, pil_kwargs=PNG_KWARGS)
+    print(f"Saved: {filename}")
+
+def _show():
+    """Show open figures, unless running on a non-interactive backend."""
+    if not HEADLESS:
+        plt.show()
+
+def split_filter_columns(all_cols):
+    """Split a list of history columns into (all_cols, filter_columns).
     
+    Photometric filters are the columns following Flux_bol.
+    """
     try:
         flux_index = all_cols.index("Flux_bol")
         filter_columns = all_cols[flux_index + 1:]
@@ -35,13 +55,32 @@ def read_header_columns(history_file):
     
     return all_cols, filter_columns
 
+def fast_mesa_load(history_path):
+    """Load a MESA history file with pandas' C parser.
+    
+    Much faster than the numpy.genfromtxt reader in older mesa_reader releases.
+    The column header comes from the same read, so the file is opened once.
+    Returns (md, all_cols, filter_columns).
+    """
+    # Lines 1-5 are the file header block; line 6 holds the column names
+    df = pd.read_csv(history_path, sep=r"\s+", skiprows=5, engine="c")
+    all_cols, filter_columns = split_filter_columns(list(df.columns))
+    return HistoryData(df), all_cols, filter_columns
+
 def setup_all_photometric_systems(filter_columns):
     """Set up all available photometric systems for comprehensive analysis."""
+    # Fresh outer dicts so callers can't alter the cached result
+    return {name: dict(info) for name, info in 
+            _setup_systems_cached(frozenset(filter_columns)).items()}
+
+@functools.lru_cache(maxsize=None)
+def _setup_systems_cached(fc):
+    """setup_all_photometric_systems for a frozenset of filters, memoized."""
     systems = {}
     
     # GAIA system
     gaia_filters = ['Gbp', 'G', 'Grp']
-    if all(f in filter_columns for f in gaia_filters):
+    if fc.issuperset(gaia_filters):
         systems['GAIA'] = {
             'filters': gaia_filters,
             'color_combinations': [
@@ -52,7 +91,7 @@ def setup_all_photometric_systems(filter_columns):
         }
     
     # Johnson-Cousins system
-    johnson_filters = [f for f in ['U', 'B', 'V', 'R', 'I'] if f in filter_columns]
+    johnson_filters = [f for f in ['U', 'B', 'V', 'R', 'I'] if f in fc]
     if len(johnson_filters) >= 3:
         systems['Johnson'] = {
             'filters': johnson_filters,
@@ -61,17 +100,17 @@ def setup_all_photometric_systems(filter_columns):
         }
         
         # Add all possible color combinations
-        if 'U' in johnson_filters and 'B' in johnson_filters and 'V' in johnson_filters:
+        if fc.issuperset(['U', 'B', 'V']):
             systems['Johnson']['color_combinations'].append(('U-B', 'B-V'))
-        if 'B' in johnson_filters and 'V' in johnson_filters and 'R' in johnson_filters:
+        if fc.issuperset(['B', 'V', 'R']):
             systems['Johnson']['color_combinations'].append(('B-V', 'V-R'))
-        if 'V' in johnson_filters and 'R' in johnson_filters and 'I' in johnson_filters:
+        if fc.issuperset(['V', 'R', 'I']):
             systems['Johnson']['color_combinations'].append(('V-R', 'R-I'))
-        if 'B' in johnson_filters and 'V' in johnson_filters and 'I' in johnson_filters:
+        if fc.issuperset(['B', 'V', 'I']):
             systems['Johnson']['color_combinations'].append(('B-V', 'V-I'))
     
     # 2MASS system  
-    twomass_filters = [f for f in ['J', 'H', 'K'] if f in filter_columns]
+    twomass_filters = [f for f in ['J', 'H', 'K'] if f in fc]
     if len(twomass_filters) >= 3:
         systems['2MASS'] = {
             'filters': twomass_filters,
@@ -83,7 +122,7 @@ def setup_all_photometric_systems(filter_columns):
         }
     
     # SDSS system
-    sdss_filters = [f for f in ['u', 'g', 'r', 'i', 'z'] if f in filter_columns]
+    sdss_filters = [f for f in ['u', 'g', 'r', 'i', 'z'] if f in fc]
     if len(sdss_filters) >= 3:
         systems['SDSS'] = {
             'filters': sdss_filters,
@@ -92,33 +131,151 @@ def setup_all_photometric_systems(filter_columns):
         }
         
         # Add SDSS color combinations
-        if 'u' in sdss_filters and 'g' in sdss_filters and 'r' in sdss_filters:
+        if fc.issuperset(['u', 'g', 'r']):
             systems['SDSS']['color_combinations'].append(('u-g', 'g-r'))
-        if 'g' in sdss_filters and 'r' in sdss_filters and 'i' in sdss_filters:
+        if fc.issuperset(['g', 'r', 'i']):
             systems['SDSS']['color_combinations'].append(('g-r', 'r-i'))
-        if 'r' in sdss_filters and 'i' in sdss_filters and 'z' in sdss_filters:
+        if fc.issuperset(['r', 'i', 'z']):
             systems['SDSS']['color_combinations'].append(('r-i', 'i-z'))
     
+    # Tuples inside, so the cached entry itself stays immutable
+    for info in systems.values():
+        info['filters'] = tuple(info['filters'])
+        info['color_combinations'] = tuple(info['color_combinations'])
+    
     return systems
 
-def get_color_data(md, color_name):
-    """Extract color data from MESA data object."""
+def build_color_cache(md, filter_columns):
+    """Fetch every filter column once into an (N, n_filters) array.
+    
+    Returns (filters, filter_idx) where filter_idx maps filter name to column.
+    """
+    columns = []
+    names = []
+    for f in filter_columns:
+        try:
+            columns.append(getattr(md, f))
+        except AttributeError:
+            try:
+                columns.append(md.data(f))
+            except Exception:
+                continue
+        names.append(f)
+    
+    if not columns:
+        return np.empty((0, 0)), {}
+    
+    # Single precision is far finer than anything visible on the plots and
+    # halves the bytes pushed through matplotlib
+    filters = np.column_stack(columns).astype(np.float32, copy=False)
+    return filters, {name: idx for idx, name in enumerate(names)}
+
+def get_color_data(color_cache, color_name):
+    """Compute a color such as 'B-V' from a build_color_cache result."""
     if '-' not in color_name:
         return None
     
+    filters, filter_idx = color_cache
     f1, f2 = color_name.split('-')
     
-    try:
-        mag1 = getattr(md, f1)
-        mag2 = getattr(md, f2)
-    except AttributeError:
-        try:
-            mag1 = md.data(f1)
-            mag2 = md.data(f2)
-        except:
-            return None
+    if f1 not in filter_idx or f2 not in filter_idx:
+        return None
     
-    return mag1 - mag2
+    return filters[:, filter_idx[f1]] - filters[:, filter_idx[f2]]
+
+def _color_pairs(filter_idx, color_combinations):
+    """Filter column pairs for each color combination.
+    
+    Returns (pairs, valid): pairs[i, axis] holds the (left, right) filter
+    columns of the x (axis 0) and y (axis 1) colors of combination i.
+    """
+    n_combos = len(color_combinations)
+    pairs = np.zeros((n_combos, 2, 2), dtype=np.int64)
+    valid = np.ones(n_combos, dtype=bool)
+    
+    for i, combo in enumerate(color_combinations):
+        for axis, color_name in enumerate(combo):
+            names = color_name.split('-')
+            if len(names) != 2 or not all(n in filter_idx for n in names):
+                valid[i] = False
+                continue
+            pairs[i, axis] = [filter_idx[names[0]], filter_idx[names[1]]]
+    
+    return pairs, valid
+
+def compute_system_colors(filters, filter_idx, color_combinations):
+    """Compute every (x, y) color pair of a system in one indexing operation.
+    
+    Returns (xy, valid): xy has shape (n_combos, 2, N) with xy[i, 0] and
+    xy[i, 1] the x and y colors of combination i; valid[i] is False (and
+    xy[i] NaN) when a filter of that combination is unavailable.
+    """
+    pairs, valid = _color_pairs(filter_idx, color_combinations)
+    
+    if filters.size == 0:
+        return np.full((len(valid), 2, 0), np.nan), np.zeros_like(valid)
+    
+    # (N, n_combos, 2) -> (n_combos, 2, N)
+    xy = (filters[:, pairs[..., 0]] - filters[:, pairs[..., 1]]).transpose(1, 2, 0)
+    xy[~valid] = np.nan
+    return xy, valid
+
+def find_phase_indices(center_h1, targets):
+    """Indices of the models whose central H1 is closest to each target.
+    
+    center_h1 normally decreases monotonically, in which case one
+    searchsorted call finds all targets; otherwise fall back to argmin.
+    """
+    center_h1 = np.asarray(center_h1)
+    targets = np.asarray(targets, dtype=float)
+    
+    if not np.all(np.diff(center_h1) <= 0):
+        return np.abs(center_h1[:, None] - targets).argmin(axis=0)
+    
+    idx = np.minimum(np.searchsorted(-center_h1, -targets), len(center_h1) - 1)
+    # searchsorted gives the insertion point; step back if the previous model is closer
+    prev = np.maximum(idx - 1, 0)
+    closer = np.abs(center_h1[prev] - targets) <= np.abs(center_h1[idx] - targets)
+    return np.where(closer, prev, idx)
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True)
+    def _fused_colors(filters, left, right):
+        """Fused kernel: every color difference in one pass, without temporaries."""
+        n_rows = filters.shape[0]
+        out = np.empty((left.size, n_rows), dtype=filters.dtype)
+        for k in range(left.size):
+            l = left[k]
+            r = right[k]
+            for n in range(n_rows):
+                out[k, n] = filters[n, l] - filters[n, r]
+        return out
+else:
+    _fused_colors = None
+
+def compute_colors_and_phase(filters, filter_idx, color_combinations, center_h1, targets):
+    """Colors for every combination plus the models closest to each H1 target.
+    
+    Returns (xy, valid, phase) with xy and valid as from compute_system_colors
+    and phase the find_phase_indices result. The colors come from a single
+    numba kernel when numba is installed, otherwise plain NumPy.
+    """
+    phase = find_phase_indices(center_h1, targets) if len(targets) else np.zeros(0, dtype=int)
+    if _fused_colors is None or filters.size == 0:
+        xy, valid = compute_system_colors(filters, filter_idx, color_combinations)
+        return xy, valid, phase
+    
+    pairs, valid = _color_pairs(filter_idx, color_combinations)
+    out = _fused_colors(np.ascontiguousarray(filters),
+                        pairs[..., 0].ravel(), pairs[..., 1].ravel())
+    xy = out.reshape(len(valid), 2, filters.shape[0])
+    xy[~valid] = np.nan
+    return xy, valid, phase
 
 def plot_single_color_color(logs_path="LOGS"):
     """Create color-color plots for a single MESA model."""
@@ -133,11 +290,10 @@ def plot_single_color_color(logs_path="LOGS"):
         return
     
     print(f"Loading MESA data from {history_path}")
-    md = mr.MesaData(history_path)
+    md, all_cols, filter_columns = fast_mesa_load(history_path)
     
-    # Get filter information
-    all_cols, filter_columns = read_header_columns(history_path)
     print(f"Available photometric filters: {filter_columns}")
+    color_cache = build_color_cache(md, filter_columns)
     
     # Set up all photometric systems
     systems = setup_all_photometric_systems(filter_columns)
@@ -150,10 +306,24 @@ def plot_single_color_color(logs_path="LOGS"):
     
     # Create figure with subplots for each system
     n_systems = len(systems)
-    fig = plt.figure(figsize=(15, 5 * n_systems))
+    fig = plt.figure(figsize=(15, 5 * n_systems), layout='constrained')
     
     plot_idx = 1
     
+    # Colors for every system and the evolutionary phase markers, in one call
+    has_h1 = hasattr(md, 'center_h1')
+    center_h1 = md.center_h1 if has_h1 else np.zeros(0)
+    targets = [0.7, 1e-6] if has_h1 else []  # ZAMS, TAMS
+    all_combos = [combo for system_data in systems.values() 
+                  for combo in system_data['color_combinations']]
+    all_xy, all_valid, phase = compute_colors_and_phase(*color_cache, all_combos, 
+                                                        center_h1, targets)
+    if has_h1:
+        h1_range = center_h1.max() - center_h1.min()
+        zams_idx, tams_idx = phase
+    
+    combo_start = 0
+    
     for system_name, system_data in systems.items():
         print(f"Creating color-color plots for {system_name}...")
         
@@ -161,41 +331,43 @@ def plot_single_color_color(logs_path="LOGS"):
         if n_combinations == 0:
             continue
         
+        # This system's slice of the colors computed above
+        xy = all_xy[combo_start:combo_start + n_combinations]
+        valid = all_valid[combo_start:combo_start + n_combinations]
+        combo_start += n_combinations
+        
         # Create subplot grid for this system
         for i, (color1, color2) in enumerate(system_data['color_combinations']):
             ax = plt.subplot(n_systems, max(2, n_combinations), plot_idx)
             plot_idx += 1
             
-            # Get color data
-            color1_data = get_color_data(md, color1)
-            color2_data = get_color_data(md, color2)
-            
-            if color1_data is None or color2_data is None:
+            if not valid[i]:
                 print(f"Warning: Could not compute colors {color1} or {color2}")
                 continue
             
+            color1_data, color2_data = xy[i]
+            
             # Create evolutionary track with time coloring
-            if hasattr(md, 'center_h1'):
+            if has_h1:
                 # Color by hydrogen abundance (evolutionary phase)
-                scatter = ax.scatter(color1_data, color2_data, c=md.center_h1, 
-                                   cmap='plasma_r', s=30, alpha=0.8, edgecolor='none')
+                # Thin very long histories; neighbouring models overlap anyway
+                stride = max(1, len(color1_data) // MAX_SCATTER_POINTS)
+                scatter = ax.scatter(color1_data[::stride], color2_data[::stride], 
+                                   c=center_h1[::stride].astype(np.float32), cmap='plasma_r', s=30, 
+                                   alpha=0.8, edgecolor='none', rasterized=True)
                 
                 # Add colorbar
                 cbar = plt.colorbar(scatter, ax=ax)
                 cbar.set_label('Central H1 Fraction')
                 
                 # Mark evolutionary phases
-                if np.max(md.center_h1) - np.min(md.center_h1) > 0.6:
+                if h1_range > 0.6:
                     # ZAMS (high H1)
-                    zams_h1 = 0.7
-                    zams_idx = np.abs(md.center_h1 - zams_h1).argmin()
                     ax.scatter(color1_data[zams_idx], color2_data[zams_idx], 
                              marker='*', s=300, edgecolor='black', facecolor='navy',
                              label='ZAMS', zorder=10)
                     
                     # TAMS (low H1) 
-                    tams_h1 = 1e-6
-                    tams_idx = np.abs(md.center_h1 - tams_h1).argmin()
                     ax.scatter(color1_data[tams_idx], color2_data[tams_idx], 
                              marker='s', s=200, edgecolor='black', facecolor='gold',
                              label='TAMS', zorder=10)
@@ -216,14 +388,51 @@ def plot_single_color_color(logs_path="LOGS"):
             ax.grid(alpha=0.3)
     
     plt.suptitle("Multi-System Color-Color Diagrams - Custom Colors Showcase", fontsize=16)
-    plt.tight_layout()
     
     # Save the plot
-    os.makedirs("plots", exist_ok=True)
-    plt.savefig("plots/color_color_diagrams_single.png", dpi=300, bbox_inches='tight')
+    _ensure_plots_dir()
+    plt.savefig("plots/color_color_diagrams_single.png", dpi=300)
     print("Saved: plots/color_color_diagrams_single.png")
     
-    plt.show()
+    _show()
+
+def _load_run(args):
+    """Load one batch run's filter arrays (runs in a worker process).
+    
+    args is (runs_dir, run_dir). Returns the run_info dict, or None if the
+    run has no usable history.
+    """
+    runs_dir, run_dir = args
+    history_path = os.path.join(runs_dir, run_dir, "LOGS", "history.data")
+    
+    if not os.path.exists(history_path):
+        return None
+    
+    try:
+        # Parse parameters
+        params = parse_run_name(run_dir)
+        if params is None:
+            raise ValueError(f"unrecognised run directory name '{run_dir}'")
+        mass, scheme = params['mass'], params['scheme']
+        
+        # Load data and filter information
+        md, all_cols, filter_columns = fast_mesa_load(history_path)
+        
+        if not filter_columns:
+            return None
+        
+        # Only the filter arrays go back to the main process, not the whole history
+        return {
+            'colors': build_color_cache(md, filter_columns),
+            'mass': mass,
+            'scheme': scheme,
+            'filter_columns': filter_columns,
+            'run_dir': run_dir
+        }
+            
+    except Exception as e:
+        print(f"Error processing {run_dir}: {e}")
+        return None
 
 def plot_batch_color_color(runs_dir="../runs"):
     """Create comparative color-color plots for batch MESA runs."""
@@ -233,8 +442,7 @@ def plot_batch_color_color(runs_dir="../runs"):
         return
     
     # Find all run directories
-    run_dirs = [d for d in os.listdir(runs_dir) 
-                if d.startswith('inlist_M') and os.path.isdir(os.path.join(runs_dir, d))]
+    run_dirs = find_run_dirs(runs_dir)
     
     if not run_dirs:
         print("No batch run directories found")
@@ -242,58 +450,18 @@ def plot_batch_color_color(runs_dir="../runs"):
     
     print(f"Found {len(run_dirs)} model runs")
     
-    # Parse run parameters and collect data
-    all_data = []
-    mass_colors = {}
-    scheme_linestyles = {}
+    # Load every run in parallel; plotting stays on the main process
+    with ProcessPoolExecutor() as ex:
+        results = list(ex.map(_load_run, [(runs_dir, d) for d in run_dirs]))
     
-    for run_dir in run_dirs:
-        history_path = os.path.join(runs_dir, run_dir, "LOGS", "history.data")
-        
-        if not os.path.exists(history_path):
-            continue
-        
-        try:
-            # Parse parameters
-            parts = run_dir.replace('inlist_M', '').split('_')
-            mass = float(parts[0])
-            
-            if 'noovs' in run_dir:
-                scheme = 'none'
-            else:
-                scheme = parts[2] if len(parts) > 2 else 'unknown'
-            
-            # Load data
-            md = mr.MesaData(history_path)
-            
-            # Get filter information
-            all_cols, filter_columns = read_header_columns(history_path)
-            
-            if not filter_columns:
-                continue
-            
-            # Store data
-            run_info = {
-                'data': md,
-                'mass': mass,
-                'scheme': scheme,
-                'filter_columns': filter_columns,
-                'run_dir': run_dir
-            }
-            all_data.append(run_info)
-            
-            # Assign colors by mass
-            if mass not in mass_colors:
-                mass_colors[mass] = plt.cm.viridis(len(mass_colors) / 10.0)
-            
-            # Assign line styles by scheme
-            if scheme not in scheme_linestyles:
-                styles = ['-', '--', '-.', ':']
-                scheme_linestyles[scheme] = styles[len(scheme_linestyles) % len(styles)]
-                
-        except Exception as e:
-            print(f"Error processing {run_dir}: {e}")
-            continue
+    all_data = [run_info for run_info in results if run_info is not None]
+    
+    # Assign line styles by scheme
+    scheme_linestyles = {}
+    styles = ['-', '--', '-.', ':']
+    for run in all_data:
+        if run['scheme'] not in scheme_linestyles:
+            scheme_linestyles[run['scheme']] = styles[len(scheme_linestyles) % len(styles)]
     
     if not all_data:
         print("No valid data found!")
@@ -301,6 +469,11 @@ def plot_batch_color_color(runs_dir="../runs"):
     
     print(f"Successfully loaded {len(all_data)} models")
     
+    # Assign colors by mass rank, sampling the colormap once for all masses
+    unique_masses = sorted({run['mass'] for run in all_data})
+    mass_rgba = plt.cm.viridis(np.linspace(0, 0.9, len(unique_masses)))
+    mass_colors = dict(zip(unique_masses, mass_rgba))
+    
     # Find common photometric systems
     all_filter_sets = [set(run['filter_columns']) for run in all_data]
     common_filters = list(set.intersection(*all_filter_sets))
@@ -314,49 +487,79 @@ def plot_batch_color_color(runs_dir="../runs"):
         print("No common photometric systems found!")
         return
     
-    # Create comparison plots for each system
+    # Create comparison plots for each system, saving each one before the
+    # next is drawn. Headless, one figure is cleared and redrawn per system;
+    # interactively each is shown (which closes it) before the next.
+    fig = None
     for system_name, system_data in systems.items():
-        create_batch_color_color_system(all_data, system_name, system_data, 
-                                       mass_colors, scheme_linestyles)
+        fig, filename = create_batch_color_color_system(all_data, system_name, system_data, 
+                                                        mass_colors, scheme_linestyles, fig=fig)
+        if filename is None:
+            continue
+        
+        _save_figure(fig, filename)
+        _show()
+    
+    if fig is not None and HEADLESS:
+        plt.close(fig)
 
 def create_batch_color_color_system(all_data, system_name, system_data, 
-                                   mass_colors, scheme_linestyles):
-    """Create batch color-color plots for a specific photometric system."""
+                                   mass_colors, scheme_linestyles, fig=None):
+    """Create batch color-color plots for a specific photometric system.
+    
+    If fig is given (and still open) it is cleared and reused rather than
+    creating a new figure. Returns (fig, filename) for the caller to save;
+    filename is None if the system had nothing to plot.
+    """
     
     color_combinations = system_data['color_combinations']
     n_combinations = len(color_combinations)
     
     if n_combinations == 0:
-        return
-    
-    fig, axes = plt.subplots(1, n_combinations, figsize=(7*n_combinations, 6))
+        return fig, None
+    
+    # A figure closed by plt.show() can't be shown again, so start a fresh one
+    if fig is None or not plt.fignum_exists(fig.number):
+        fig = plt.figure(layout='constrained')
+    fig.clf()
+    fig.set_size_inches(7*n_combinations, 6)
+    axes = fig.subplots(1, n_combinations)
     if n_combinations == 1:
         axes = [axes]
     
+    # Every color combination of each run, computed once per run
+    run_colors = [compute_system_colors(*run['colors'], color_combinations) for run in all_data]
+    
     for i, (color1, color2) in enumerate(color_combinations):
         ax = axes[i]
         
+        # Tracks for every model are drawn as one LineCollection
+        tracks = []
+        track_colors = []
+        track_styles = []
+        
         # Plot each model
-        for run in all_data:
-            md = run['data']
-            
-            color1_data = get_color_data(md, color1)
-            color2_data = get_color_data(md, color2)
-            
-            if color1_data is None or color2_data is None:
+        for run, (xy, valid) in zip(all_data, run_colors):
+            if not valid[i]:
                 continue
             
-            color = mass_colors[run['mass']]
-            linestyle = scheme_linestyles[run['scheme']]
+            # Evolutionary track
+            tracks.append(xy[i].T)
+            track_colors.append(mass_colors[run['mass']])
+            track_styles.append(scheme_linestyles[run['scheme']])
             
-            # Plot evolutionary track
-            ax.plot(color1_data, color2_data, color=color, linestyle=linestyle,
-                   linewidth=2, alpha=0.8)
+        if tracks:
+            track_colors = np.asarray(track_colors)
+            ax.add_collection(LineCollection(tracks, colors=track_colors,
+                                             linestyles=track_styles, linewidths=2, alpha=0.8))
+            ax.autoscale_view()
             
-            # Mark start and end points
-            ax.scatter(color1_data[0], color2_data[0], color=color, 
+            # Mark start and end points of all tracks with one scatter each
+            starts = np.array([track[0] for track in tracks])
+            ends = np.array([track[-1] for track in tracks])
+            ax.scatter(starts[:, 0], starts[:, 1], c=track_colors, 
                       marker='o', s=60, alpha=0.9, edgecolor='black', linewidth=0.5)
-            ax.scatter(color1_data[-1], color2_data[-1], color=color, 
+            ax.scatter(ends[:, 0], ends[:, 1], c=track_colors, 
                       marker='s', s=60, alpha=0.9, edgecolor='black', linewidth=0.5)
         
         ax.set_xlabel(color1)
@@ -392,17 +595,10 @@ def create_batch_color_color_system(all_data, system_name, system_data,
     else:
         axes[0].legend(handles=legend_elements, bbox_to_anchor=(1.05, 1), loc='upper left')
     
-    plt.suptitle(f"{system_name} Color-Color Diagrams - Parameter Study\n"
+    fig.suptitle(f"{system_name} Color-Color Diagrams - Parameter Study\n"
                 f"{system_data['description']}", fontsize=14)
-    plt.tight_layout()
-    
-    # Save the plot
-    os.makedirs("plots", exist_ok=True)
-    filename = f"plots/batch_color_color_{system_name.lower()}.png"
-    plt.savefig(filename, dpi=300, bbox_inches='tight')
-    print(f"Saved: {filename}")
     
-    plt.show()
+    return fig, f"plots/batch_color_color_{system_name.lower()}.png"
 
 def create_multi_system_comparison(logs_path="LOGS"):
     """Create a comprehensive comparison showing all systems side by side."""
@@ -416,9 +612,9 @@ def create_multi_system_comparison(logs_path="LOGS"):
         print(f"Error: Could not find history.data in {logs_path}")
         return
     
-    md = mr.MesaData(history_path)
-    all_cols, filter_columns = read_header_columns(history_path)
+    md, all_cols, filter_columns = fast_mesa_load(history_path)
     systems = setup_all_photometric_systems(filter_columns)
+    color_cache = build_color_cache(md, filter_columns)
     
     if len(systems) < 2:
         print("Need at least 2 photometric systems for comparison")
@@ -426,7 +622,7 @@ def create_multi_system_comparison(logs_path="LOGS"):
     
     # Create a grid showing one color-color diagram per system
     n_systems = len(systems)
-    fig, axes = plt.subplots(1, n_systems, figsize=(5*n_systems, 5))
+    fig, axes = plt.subplots(1, n_systems, figsize=(5*n_systems, 5), layout='constrained')
     if n_systems == 1:
         axes = [axes]
     
@@ -439,26 +635,29 @@ def create_multi_system_comparison(logs_path="LOGS"):
         # Use the first color combination for each system
         color1, color2 = system_data['color_combinations'][0]
         
-        color1_data = get_color_data(md, color1)
-        color2_data = get_color_data(md, color2)
+        color1_data = get_color_data(color_cache, color1)
+        color2_data = get_color_data(color_cache, color2)
         
         if color1_data is None or color2_data is None:
             continue
         
         # Plot with evolutionary phases
         if hasattr(md, 'center_h1'):
-            scatter = ax.scatter(color1_data, color2_data, c=md.center_h1, 
-                               cmap='plasma_r', s=40, alpha=0.8)
+            stride = max(1, len(color1_data) // MAX_SCATTER_POINTS)
+            scatter = ax.scatter(color1_data[::stride], color2_data[::stride], 
+                               c=md.center_h1[::stride].astype(np.float32), cmap='plasma_r', s=40, 
+                               alpha=0.8, rasterized=True)
             
-            # Add arrows to show direction
+            # Add arrows to show direction, all drawn by a single quiver
             n_points = len(color1_data)
             step = max(1, n_points // 20)  # Show ~20 arrows
             
-            for j in range(0, n_points-step, step):
-                ax.annotate('', xy=(color1_data[j+step], color2_data[j+step]),
-                           xytext=(color1_data[j], color2_data[j]),
-                           arrowprops=dict(arrowstyle='->', color='black', 
-                                         alpha=0.5, lw=1))
+            idx = np.arange(0, n_points - step, step)
+            x = color1_data[idx]
+            y = color2_data[idx]
+            ax.quiver(x, y, color1_data[idx + step] - x, color2_data[idx + step] - y,
+                     angles='xy', scale_units='xy', scale=1, color='black', 
+                     alpha=0.5, width=0.003)
         else:
             ax.plot(color1_data, color2_data, '-', linewidth=2)
         
@@ -468,13 +667,13 @@ def create_multi_system_comparison(logs_path="LOGS"):
         ax.grid(alpha=0.3)
     
     plt.suptitle("Multi-System Color-Color Comparison", fontsize=16)
-    plt.tight_layout()
     
     # Save the plot
-    plt.savefig("plots/multi_system_color_color.png", dpi=300, bbox_inches='tight')
+    _ensure_plots_dir()
+    plt.savefig("plots/multi_system_color_color.png", dpi=300)
     print("Saved: plots/multi_system_color_color.png")
     
-    plt.show()
+    _show()
 
 if __name__ == "__main__":
     print("MESA Custom Colors - Color-Color Diagram Analysis")
@@ -5,36 +5,85 @@ Demonstrates how stellar internal structure changes manifest in observable color
 """
 
 import os
+import sys
+import json
+import hashlib
+import functools
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
+from mesa_figures import HEADLESS, PNG_KWARGS
+
 import matplotlib.pyplot as plt
-import mesa_reader as mr
 import matplotlib.gridspec as gridspec
 import glob
 from scipy import stats
 from matplotlib.colors import LogNorm
+from matplotlib.collections import LineCollection
+from PIL import Image
+from mesa_runs import find_run_dirs, parse_run_name
+from mesa_cache import HistoryData, read_mesa_table
 
-def read_header_columns(history_file):
-    """Read column headers from history file to find available filters."""
-    header_line = None
-    with open(history_file, "r") as fp:
-        for line in fp:
-            if "model_number" in line:
-                header_line = line.strip()
+# Single-model figures are saved at print quality, batch overviews at screen quality
+_SINGLE_DPI = 300
+_BATCH_DPI = 150
+
+@functools.lru_cache(maxsize=None)
+def _read_header_cached(path, mtime):
+    """Parse the column header of path; mtime is only part of the cache key."""
+    # The header block sits at the top of the file, normally inside the first 64 KiB
+    with open(path, "rb") as fp:
+        head = fp.read(65536)
+        header_line = None
+        lines = head.split(b"\n")
+        for i, line in enumerate(lines):
+            if b"model_number" in line:
+                header_line = line
+                if i == len(lines) - 1 and len(head) == 65536:
+                    # The line runs past the buffer; read on to its newline
+                    header_line += fp.readline().rstrip(b"\n")
                 break
+        
+        if header_line is None and len(head) == 65536:
+            fp.seek(0)
+            for line in fp:
+                if b"model_number" in line:
+                    header_line = line
+                    break
     
     if header_line is None:
-        return [], []
+        return (), ()
     
-    all_cols = header_line.split()
+    all_cols = tuple(header_line.decode().split())
     
     try:
         flux_index = all_cols.index("Flux_bol")
         filter_columns = all_cols[flux_index + 1:]
     except ValueError:
-        filter_columns = []
+        filter_columns = ()
     
     return all_cols, filter_columns
 
+def read_header_columns(history_file):
+    """Read column headers from history file to find available filters."""
+    all_cols, filter_columns = _read_header_cached(history_file, os.path.getmtime(history_file))
+    return list(all_cols), list(filter_columns)
+
+# Physics columns the single-model and batch plots may use besides the filters
+_SINGLE_COLUMNS = ('star_age', 'star_mass', 'center_h1', 'log_center_T', 'log_center_Rho',
+                   'log_Teff', 'log_L', 'log_R', 'log_LH', 'log_center_eps_nuc',
+                   'log_abs_mdot', 'he_core_mass', 'mass_conv_core', 'conv_mx1_top')
+_BATCH_COLUMNS = ('log_center_T', 'log_center_Rho', 'log_L', 'log_Teff')
+
+def load_history(history_path, columns):
+    """Load only the named history columns through mesa_cache.read_mesa_table.
+    
+    Columns missing from the file are skipped, so hasattr() on the result
+    works as it would on a full mr.MesaData.
+    """
+    wanted = set(columns)
+    header, _, df = read_mesa_table(history_path, lambda cols: [c for c in cols if c in wanted])
+    return HistoryData(df, header)
+
 def setup_primary_photometric_system(md, filter_columns):
     """Choose the best available photometric system for analysis."""
     
@@ -46,8 +95,9 @@ def setup_primary_photometric_system(md, filter_columns):
         ('SDSS', ['g', 'r'], 'g-r', 'r')
     ]
     
+    fc = frozenset(filter_columns)
     for name, required_filters, primary_color, primary_mag in systems:
-        if all(f in filter_columns for f in required_filters):
+        if fc.issuperset(required_filters):
             return {
                 'name': name,
                 'filters': required_filters,
@@ -73,8 +123,38 @@ def get_color_magnitude_data(md, system):
     color = mag1 - mag2
     return color, primary_mag
 
-def plot_physics_photometry_single(logs_path="LOGS"):
-    """Create comprehensive physics-photometry correlation plots for a single model."""
+# PNG text key holding the stamp of what a plot was drawn from
+_STAMP_KEY = "mesa_colors_stamp"
+
+def _source_stamp(*inputs):
+    """Stamp naming every input file (path, mtime, size) and this script's contents."""
+    with open(__file__, "rb") as fp:
+        script = hashlib.sha1(fp.read()).hexdigest()
+    sources = sorted((os.path.abspath(p), os.stat(p).st_mtime_ns, os.stat(p).st_size) for p in inputs)
+    return json.dumps({"script": script, "sources": sources})
+
+def _up_to_date(output, stamp):
+    """True if output exists and was saved with the same source stamp."""
+    try:
+        with Image.open(output) as im:
+            return im.text.get(_STAMP_KEY) == stamp
+    except (OSError, AttributeError):
+        return False
+
+def _physics_figure():
+    """Return the shared physics-photometry figure, cleared for a new model."""
+    fig = plt.figure(num="physics_photometry", clear=True)
+    fig.set_size_inches(20, 15)
+    return fig
+
+def plot_physics_photometry_single(logs_path="LOGS", fig=None, dpi=_SINGLE_DPI, skip_up_to_date=False):
+    """Create comprehensive physics-photometry correlation plots for a single model.
+    
+    Draws on fig if given (after clearing it), otherwise on one shared figure
+    that is reused between calls rather than building a new one each time.
+    The PNG is saved at dpi. With skip_up_to_date, nothing is redrawn if the
+    PNG was last drawn by this same script from this same history.data.
+    """
     
     if not os.path.isdir(logs_path):
         print(f"Error: Could not find {logs_path} directory")
@@ -85,12 +165,9 @@ def plot_physics_photometry_single(logs_path="LOGS"):
         print(f"Error: Could not find history.data in {logs_path}")
         return
     
-    print(f"Loading MESA data from {history_path}")
-    md = mr.MesaData(history_path)
-    
-    # Get photometric system
+    # Get photometric system; the header alone is enough to pick it
     all_cols, filter_columns = read_header_columns(history_path)
-    system = setup_primary_photometric_system(md, filter_columns)
+    system = setup_primary_photometric_system(None, filter_columns)
     
     if system is None:
         print("No suitable photometric system found!")
@@ -98,22 +175,94 @@ def plot_physics_photometry_single(logs_path="LOGS"):
     
     print(f"Using {system['name']} photometric system")
     
+    filename = f"plots/physics_photometry_{system['name'].lower()}.png"
+    stamp = _source_stamp(history_path)
+    if skip_up_to_date and _up_to_date(filename, stamp):
+        print(f"{filename} is up to date with {history_path}, skipping")
+        return
+    
+    print(f"Loading MESA data from {history_path}")
+    md = load_history(history_path, (*_SINGLE_COLUMNS, *system['filters']))
+    
+    # Column availability from the header, instead of probing md with hasattr
+    avail = frozenset(all_cols)
+    
     # Get color and magnitude data
     color, magnitude = get_color_magnitude_data(md, system)
     
+    # Columns used by several panels, fetched once
+    age_myr = md.star_age * 1e-6 if 'star_age' in avail else None
+    center_h1 = md.center_h1 if 'center_h1' in avail else None
+    log_center_T = md.log_center_T if 'log_center_T' in avail else None
+    log_center_Rho = md.log_center_Rho if 'log_center_Rho' in avail else None
+    
+    # Thin long histories for the scatter panels; ~2000 points look the same
+    stride = max(1, color.size // 2000)
+    sl = slice(None, None, stride)
+    
+    # Data for the panels that depend on optional columns
+    core_mass = None
+    if 'he_core_mass' in avail:
+        core_mass = md.he_core_mass
+        core_label = 'He Core Mass (M☉)'
+    elif 'mass_conv_core' in avail:
+        core_mass = md.mass_conv_core
+        core_label = 'Convective Core Mass (M☉)'
+    elif 'conv_mx1_top' in avail:
+        if 'star_mass' in avail:
+            core_mass = md.conv_mx1_top * md.star_mass
+        else:
+            core_mass = md.conv_mx1_top
+        core_label = 'Convective Core Mass (M☉)'
+    
+    nuclear_var = None
+    if 'log_LH' in avail:
+        nuclear_var = md.log_LH
+        nuclear_label = 'log H Burning Luminosity'
+    elif 'log_center_eps_nuc' in avail:
+        nuclear_var = md.log_center_eps_nuc
+        nuclear_label = 'log Central Nuclear Energy Rate'
+    
+    mdot_idx = None
+    if 'log_abs_mdot' in avail and 'star_age' in avail:
+        # Only plot points where mass loss is significant, thinned like the other panels
+        log_abs_mdot = md.log_abs_mdot
+        mdot_idx = np.flatnonzero(log_abs_mdot > -10)
+        mdot_idx = mdot_idx[::max(1, mdot_idx.size // 2000)]
+    
+    # Lay the grid out for the panels that will be drawn: single panels four
+    # to a row, then the wide panels side by side (a lone one spans the row),
+    # so missing columns don't leave empty cells
+    n_single = sum([log_center_T is not None, log_center_Rho is not None,
+                    core_mass is not None, 'log_Teff' in avail and log_center_T is not None,
+                    'log_L' in avail, nuclear_var is not None, 'log_R' in avail,
+                    mdot_idx is not None and mdot_idx.size > 0])
+    n_wide = sum([age_myr is not None, log_center_T is not None and log_center_Rho is not None])
+    single_rows = -(-n_single // 4)
+    n_rows = max(1, single_rows + -(-n_wide // 2))
+    
     # Create comprehensive figure
-    fig = plt.figure(figsize=(20, 15))
-    gs = gridspec.GridSpec(3, 4, figure=fig, hspace=0.3, wspace=0.3)
+    if fig is None:
+        fig = _physics_figure()
+    else:
+        fig.clf()
+    fig.set_size_inches(20, 5 * n_rows)
+    gs = gridspec.GridSpec(n_rows, 4, figure=fig, hspace=0.3, wspace=0.3)
+    cells = iter([gs[i // 4, i % 4] for i in range(n_single)])
+    if n_wide == 1:
+        wide_cells = iter([gs[single_rows, :]])
+    else:
+        wide_cells = iter([gs[single_rows + i // 2, 2 * (i % 2):2 * (i % 2) + 2] for i in range(n_wide)])
     
     # Plot 1: Color vs Central Temperature
-    ax1 = fig.add_subplot(gs[0, 0])
-    if hasattr(md, 'log_center_T'):
-        if hasattr(md, 'center_h1'):
-            scatter = ax1.scatter(md.log_center_T, color, c=md.center_h1, 
-                                cmap='plasma_r', s=30, alpha=0.8)
+    if 'log_center_T' in avail:
+        ax1 = fig.add_subplot(next(cells))
+        if 'center_h1' in avail:
+            scatter = ax1.scatter(log_center_T[sl], color[sl], c=center_h1[sl], 
+                                cmap='plasma_r', s=30, alpha=0.8, rasterized=True)
             plt.colorbar(scatter, ax=ax1, label='Central H1')
         else:
-            ax1.plot(md.log_center_T, color, '-', color='blue', linewidth=2)
+            ax1.plot(log_center_T, color, '-', color='blue', linewidth=2)
         
         ax1.set_xlabel('log Central Temperature')
         ax1.set_ylabel(f'{system["primary_color"]}')
@@ -121,14 +270,14 @@ def plot_physics_photometry_single(logs_path="LOGS"):
         ax1.grid(alpha=0.3)
     
     # Plot 2: Magnitude vs Central Density
-    ax2 = fig.add_subplot(gs[0, 1])
-    if hasattr(md, 'log_center_Rho'):
-        if hasattr(md, 'center_h1'):
-            scatter = ax2.scatter(md.log_center_Rho, magnitude, c=md.center_h1, 
-                                cmap='plasma_r', s=30, alpha=0.8)
+    if 'log_center_Rho' in avail:
+        ax2 = fig.add_subplot(next(cells))
+        if 'center_h1' in avail:
+            scatter = ax2.scatter(log_center_Rho[sl], magnitude[sl], c=center_h1[sl], 
+                                cmap='plasma_r', s=30, alpha=0.8, rasterized=True)
             plt.colorbar(scatter, ax=ax2, label='Central H1')
         else:
-            ax2.plot(md.log_center_Rho, magnitude, '-', color='red', linewidth=2)
+            ax2.plot(log_center_Rho, magnitude, '-', color='red', linewidth=2)
         
         ax2.set_xlabel('log Central Density')
         ax2.set_ylabel(f'{system["primary_mag"]} magnitude')
@@ -137,25 +286,11 @@ def plot_physics_photometry_single(logs_path="LOGS"):
         ax2.grid(alpha=0.3)
     
     # Plot 3: Color vs Convective Core Mass
-    ax3 = fig.add_subplot(gs[0, 2])
-    core_mass = None
-    if hasattr(md, 'he_core_mass'):
-        core_mass = md.he_core_mass
-        core_label = 'He Core Mass (M☉)'
-    elif hasattr(md, 'mass_conv_core'):
-        core_mass = md.mass_conv_core
-        core_label = 'Convective Core Mass (M☉)'
-    elif hasattr(md, 'conv_mx1_top'):
-        if hasattr(md, 'star_mass'):
-            core_mass = md.conv_mx1_top * md.star_mass
-        else:
-            core_mass = md.conv_mx1_top
-        core_label = 'Convective Core Mass (M☉)'
-    
     if core_mass is not None:
-        if hasattr(md, 'star_age'):
-            scatter = ax3.scatter(core_mass, color, c=md.star_age/1e6, 
-                                cmap='viridis', s=30, alpha=0.8)
+        ax3 = fig.add_subplot(next(cells))
+        if 'star_age' in avail:
+            scatter = ax3.scatter(core_mass[sl], color[sl], c=age_myr[sl], 
+                                cmap='viridis', s=30, alpha=0.8, rasterized=True)
             plt.colorbar(scatter, ax=ax3, label='Age (Myr)')
         else:
             ax3.plot(core_mass, color, '-', color='green', linewidth=2)
@@ -166,14 +301,14 @@ def plot_physics_photometry_single(logs_path="LOGS"):
         ax3.grid(alpha=0.3)
     
     # Plot 4: Surface vs Central Properties
-    ax4 = fig.add_subplot(gs[0, 3])
-    if hasattr(md, 'log_Teff') and hasattr(md, 'log_center_T'):
-        if hasattr(md, 'center_h1'):
-            scatter = ax4.scatter(md.log_Teff, md.log_center_T, c=color, 
-                                cmap='coolwarm', s=30, alpha=0.8)
+    if 'log_Teff' in avail and 'log_center_T' in avail:
+        ax4 = fig.add_subplot(next(cells))
+        if 'center_h1' in avail:
+            scatter = ax4.scatter(md.log_Teff[sl], log_center_T[sl], c=color[sl], 
+                                cmap='coolwarm', s=30, alpha=0.8, rasterized=True)
             plt.colorbar(scatter, ax=ax4, label=system['primary_color'])
         else:
-            ax4.plot(md.log_Teff, md.log_center_T, '-', color='purple', linewidth=2)
+            ax4.plot(md.log_Teff, log_center_T, '-', color='purple', linewidth=2)
         
         ax4.set_xlabel('log Surface Temperature')
         ax4.set_ylabel('log Central Temperature')
@@ -181,11 +316,11 @@ def plot_physics_photometry_single(logs_path="LOGS"):
         ax4.grid(alpha=0.3)
     
     # Plot 5: Luminosity vs Color Evolution
-    ax5 = fig.add_subplot(gs[1, 0])
-    if hasattr(md, 'log_L'):
-        if hasattr(md, 'star_age'):
-            scatter = ax5.scatter(color, md.log_L, c=md.star_age/1e6, 
-                                cmap='plasma', s=30, alpha=0.8)
+    if 'log_L' in avail:
+        ax5 = fig.add_subplot(next(cells))
+        if 'star_age' in avail:
+            scatter = ax5.scatter(color[sl], md.log_L[sl], c=age_myr[sl], 
+                                cmap='plasma', s=30, alpha=0.8, rasterized=True)
             plt.colorbar(scatter, ax=ax5, label='Age (Myr)')
         else:
             ax5.plot(color, md.log_L, '-', color='orange', linewidth=2)
@@ -196,37 +331,26 @@ def plot_physics_photometry_single(logs_path="LOGS"):
         ax5.grid(alpha=0.3)
     
     # Plot 6: Nuclear Energy Generation vs Color
-    ax6 = fig.add_subplot(gs[1, 1])
-    if hasattr(md, 'log_LH') or hasattr(md, 'log_center_eps_nuc'):
-        nuclear_var = None
-        nuclear_label = None
-        
-        if hasattr(md, 'log_LH'):
-            nuclear_var = md.log_LH
-            nuclear_label = 'log H Burning Luminosity'
-        elif hasattr(md, 'log_center_eps_nuc'):
-            nuclear_var = md.log_center_eps_nuc
-            nuclear_label = 'log Central Nuclear Energy Rate'
+    if nuclear_var is not None:
+        ax6 = fig.add_subplot(next(cells))
+        if 'center_h1' in avail:
+            scatter = ax6.scatter(color[sl], nuclear_var[sl], c=center_h1[sl], 
+                                cmap='plasma_r', s=30, alpha=0.8, rasterized=True)
+            plt.colorbar(scatter, ax=ax6, label='Central H1')
+        else:
+            ax6.plot(color, nuclear_var, '-', color='red', linewidth=2)
         
-        if nuclear_var is not None:
-            if hasattr(md, 'center_h1'):
-                scatter = ax6.scatter(color, nuclear_var, c=md.center_h1, 
-                                    cmap='plasma_r', s=30, alpha=0.8)
-                plt.colorbar(scatter, ax=ax6, label='Central H1')
-            else:
-                ax6.plot(color, nuclear_var, '-', color='red', linewidth=2)
-            
-            ax6.set_xlabel(f'{system["primary_color"]}')
-            ax6.set_ylabel(nuclear_label)
-            ax6.set_title('Nuclear Energy vs Color')
-            ax6.grid(alpha=0.3)
+        ax6.set_xlabel(f'{system["primary_color"]}')
+        ax6.set_ylabel(nuclear_label)
+        ax6.set_title('Nuclear Energy vs Color')
+        ax6.grid(alpha=0.3)
     
     # Plot 7: Stellar Radius vs Magnitude
-    ax7 = fig.add_subplot(gs[1, 2])
-    if hasattr(md, 'log_R'):
-        if hasattr(md, 'star_age'):
-            scatter = ax7.scatter(md.log_R, magnitude, c=md.star_age/1e6, 
-                                cmap='viridis', s=30, alpha=0.8)
+    if 'log_R' in avail:
+        ax7 = fig.add_subplot(next(cells))
+        if 'star_age' in avail:
+            scatter = ax7.scatter(md.log_R[sl], magnitude[sl], c=age_myr[sl], 
+                                cmap='viridis', s=30, alpha=0.8, rasterized=True)
             plt.colorbar(scatter, ax=ax7, label='Age (Myr)')
         else:
             ax7.plot(md.log_R, magnitude, '-', color='blue', linewidth=2)
@@ -238,75 +362,65 @@ def plot_physics_photometry_single(logs_path="LOGS"):
         ax7.grid(alpha=0.3)
     
     # Plot 8: Mass Loss vs Photometry (if available)
-    ax8 = fig.add_subplot(gs[1, 3])
-    if hasattr(md, 'log_abs_mdot'):
-        if hasattr(md, 'star_age'):
-            # Only plot points where mass loss is significant
-            significant_mdot = md.log_abs_mdot > -10
-            if np.any(significant_mdot):
-                scatter = ax8.scatter(color[significant_mdot], md.log_abs_mdot[significant_mdot], 
-                                    c=md.star_age[significant_mdot]/1e6, 
-                                    cmap='plasma', s=30, alpha=0.8)
-                plt.colorbar(scatter, ax=ax8, label='Age (Myr)')
-                ax8.set_xlabel(f'{system["primary_color"]}')
-                ax8.set_ylabel('log |Mdot| (M☉/yr)')
-                ax8.set_title('Mass Loss vs Color')
-                ax8.grid(alpha=0.3)
+    if mdot_idx is not None and mdot_idx.size:
+        ax8 = fig.add_subplot(next(cells))
+        scatter = ax8.scatter(color[mdot_idx], log_abs_mdot[mdot_idx], c=age_myr[mdot_idx], 
+                            cmap='plasma', s=30, alpha=0.8, rasterized=True)
+        plt.colorbar(scatter, ax=ax8, label='Age (Myr)')
+        ax8.set_xlabel(f'{system["primary_color"]}')
+        ax8.set_ylabel('log |Mdot| (M☉/yr)')
+        ax8.set_title('Mass Loss vs Color')
+        ax8.grid(alpha=0.3)
     
     # Plot 9: Time Evolution of Key Quantities
-    ax9 = fig.add_subplot(gs[2, :2])
-    if hasattr(md, 'star_age'):
-        age_myr = md.star_age / 1e6
-        
-        # Create multiple y-axes for different quantities
-        ax9_color = ax9
-        ax9_mag = ax9.twinx()
-        ax9_lum = ax9_mag.twinx()
+    if 'star_age' in avail:
+        ax9 = fig.add_subplot(next(wide_cells))
+        # Overlay the curves min-max normalized on one axis (ranges in the legend)
+        # rather than stacking twinx axes; magnitude is flipped so brighter is up
+        series = [(color, 'b', f'{system["primary_color"]}', False),
+                  (magnitude, 'r', f'{system["primary_mag"]} magnitude', True)]
+        if 'log_L' in avail:
+            series.append((md.log_L, 'g', 'log L/L☉', False))
         
-        # Offset the third y-axis
-        ax9_lum.spines['right'].set_position(('outward', 60))
+        segments = []
+        handles = []
+        for values, line_color, label, flip in series:
+            lo, hi = np.nanmin(values), np.nanmax(values)
+            scaled = (values - lo) / (hi - lo) if hi > lo else np.zeros_like(values)
+            if flip:
+                scaled = 1 - scaled
+                lo, hi = hi, lo
+            segments.append(np.column_stack([age_myr, scaled]))
+            # Legend gives the values at the bottom and top of the axis
+            handles.append(plt.Line2D([0], [0], color=line_color, linewidth=2, 
+                                      label=f'{label} ({lo:.2f} to {hi:.2f})'))
         
-        # Plot color evolution
-        line1 = ax9_color.plot(age_myr, color, 'b-', linewidth=2, 
-                              label=f'{system["primary_color"]}')
-        ax9_color.set_xlabel('Age (Myr)')
-        ax9_color.set_ylabel(f'{system["primary_color"]}', color='b')
-        ax9_color.tick_params(axis='y', labelcolor='b')
-        
-        # Plot magnitude evolution
-        line2 = ax9_mag.plot(age_myr, magnitude, 'r-', linewidth=2, 
-                            label=f'{system["primary_mag"]}')
-        ax9_mag.set_ylabel(f'{system["primary_mag"]} magnitude', color='r')
-        ax9_mag.tick_params(axis='y', labelcolor='r')
-        ax9_mag.invert_yaxis()
-        
-        # Plot luminosity if available
-        if hasattr(md, 'log_L'):
-            line3 = ax9_lum.plot(age_myr, md.log_L, 'g-', linewidth=2, 
-                                label='log L/L☉')
-            ax9_lum.set_ylabel('log L/L☉', color='g')
-            ax9_lum.tick_params(axis='y', labelcolor='g')
-        
-        ax9_color.set_title('Evolution of Photometric Properties')
-        ax9_color.grid(alpha=0.3)
+        ax9.add_collection(LineCollection(segments, colors=[h.get_color() for h in handles], 
+                                          linewidths=2))
+        ax9.autoscale_view()
+        ax9.legend(handles=handles, loc='best', fontsize=9)
+        ax9.set_xlabel('Age (Myr)')
+        ax9.set_ylabel('Normalized value')
+        ax9.set_title('Evolution of Photometric Properties')
+        ax9.grid(alpha=0.3)
     
     # Plot 10: Phase Space Analysis
-    ax10 = fig.add_subplot(gs[2, 2:])
-    if hasattr(md, 'log_center_T') and hasattr(md, 'log_center_Rho'):
+    if 'log_center_T' in avail and 'log_center_Rho' in avail:
+        ax10 = fig.add_subplot(next(wide_cells))
         # Create a phase space plot colored by photometric color
-        scatter = ax10.scatter(md.log_center_T, md.log_center_Rho, c=color, 
-                              cmap='coolwarm', s=40, alpha=0.8)
+        scatter = ax10.scatter(log_center_T, log_center_Rho, c=color, 
+                              cmap='coolwarm', s=40, alpha=0.8, rasterized=True)
         
-        # Add evolutionary arrows
-        n_points = len(md.log_center_T)
+        # Add evolutionary arrows, all drawn by a single quiver
+        n_points = len(log_center_T)
         step = max(1, n_points // 15)
         
-        for i in range(0, n_points-step, step):
-            ax10.annotate('', 
-                         xy=(md.log_center_T[i+step], md.log_center_Rho[i+step]),
-                         xytext=(md.log_center_T[i], md.log_center_Rho[i]),
-                         arrowprops=dict(arrowstyle='->', color='black', 
-                                       alpha=0.6, lw=1))
+        idx = np.arange(0, n_points - step, step)
+        x = log_center_T[idx]
+        y = log_center_Rho[idx]
+        ax10.quiver(x, y, log_center_T[idx + step] - x, log_center_Rho[idx + step] - y,
+                   angles='xy', scale_units='xy', scale=1, width=0.002, 
+                   color='black', alpha=0.6)
         
         plt.colorbar(scatter, ax=ax10, label=f'{system["primary_color"]}')
         ax10.set_xlabel('log Central Temperature')
@@ -315,28 +429,109 @@ def plot_physics_photometry_single(logs_path="LOGS"):
         ax10.grid(alpha=0.3)
     
     # Overall title
-    model_mass = getattr(md, 'star_mass', [1.0])[-1] if hasattr(md, 'star_mass') else 1.0
+    model_mass = md.star_mass[-1] if 'star_mass' in avail else 1.0
+    # Centre the title over the drawn axes, which is what the tight crop keeps
+    left = min(ax.get_position().x0 for ax in fig.axes) if fig.axes else 0.0
+    right = max(ax.get_position().x1 for ax in fig.axes) if fig.axes else 1.0
     fig.suptitle(f'Physics-Photometry Correlations: {system["name"]} System\n'
-                f'Model Mass: {model_mass:.2f} M☉', fontsize=16)
+                f'Model Mass: {model_mass:.2f} M☉', fontsize=16, x=(left + right) / 2)
     
     # Save the plot
     os.makedirs("plots", exist_ok=True)
-    filename = f"plots/physics_photometry_{system['name'].lower()}.png"
-    plt.savefig(filename, dpi=300, bbox_inches='tight')
+    fig.savefig(filename, dpi=dpi, bbox_inches='tight', pil_kwargs=PNG_KWARGS,
+                metadata={_STAMP_KEY: stamp})
     print(f"Saved: {filename}")
     
-    plt.show()
+    if HEADLESS:
+        # Nothing to show; clear the shared figure ready for the next model
+        fig.clf()
+    else:
+        plt.show()
+
+# (final_data key, history column) for the physics values kept per batch run
+_FINAL_PHYSICS = (('final_center_T', 'log_center_T'), ('final_center_Rho', 'log_center_Rho'),
+                  ('final_log_L', 'log_L'), ('final_log_Teff', 'log_Teff'))
+
+# One row per batch run; physics values a run lacks are NaN
+_SUMMARY_DTYPE = np.dtype([('mass', 'f8'), ('color', 'f8'), ('magnitude', 'f8'),
+                           ('final_center_T', 'f8'), ('final_center_Rho', 'f8'),
+                           ('final_log_L', 'f8'), ('final_log_Teff', 'f8')])
 
-def plot_batch_physics_photometry(runs_dir="../runs"):
-    """Create physics-photometry correlation plots for batch runs."""
+def _summarize(mag1, mag2, primary_mag, log_center_T, log_center_Rho, log_L, log_Teff):
+    """Final magnitude, color and physics values of a run (NaN for empty columns)."""
+    return (primary_mag[-1], mag1[-1] - mag2[-1],
+            log_center_T[-1] if log_center_T.size else np.nan,
+            log_center_Rho[-1] if log_center_Rho.size else np.nan,
+            log_L[-1] if log_L.size else np.nan,
+            log_Teff[-1] if log_Teff.size else np.nan)
+
+def _process_run(run_dir, runs_dir):
+    """Load one batch run and return its final values (runs in a worker process)."""
+    history_path = os.path.join(runs_dir, run_dir, "LOGS", "history.data")
+    
+    if not os.path.exists(history_path):
+        return None
+    
+    try:
+        # Parse parameters
+        params = parse_run_name(run_dir)
+        if params is None:
+            raise ValueError(f"unrecognised run directory name '{run_dir}'")
+        mass = params['mass']
+        
+        # Get photometric system
+        all_cols, filter_columns = read_header_columns(history_path)
+        system = setup_primary_photometric_system(None, filter_columns)
+        
+        if system is None:
+            return None
+        
+        # Load only the columns the summary needs
+        md = load_history(history_path, (*_BATCH_COLUMNS, *system['filters']))
+        avail = frozenset(all_cols)
+        
+        # Get final values for comparison
+        f1, f2 = system['primary_color'].split('-')
+        empty = np.empty(0)
+        physics = {key: np.asarray(getattr(md, col)) if col in avail else empty
+                   for key, col in _FINAL_PHYSICS}
+        magnitude, color, *finals = _summarize(np.asarray(md.data(f1)), np.asarray(md.data(f2)),
+                                               np.asarray(md.data(system['primary_mag'])),
+                                               *physics.values())
+        
+        # The history itself stays in the worker; only scalars are pickled back
+        final_data = {
+            'mass': mass,
+            'color': color,
+            'magnitude': magnitude,
+            'system': system,
+            'run_dir': run_dir
+        }
+        
+        # Add physics parameters if available
+        for (key, col), value in zip(_FINAL_PHYSICS, finals):
+            if physics[key].size:
+                final_data[key] = value
+        
+        return final_data
+        
+    except Exception as e:
+        print(f"Error processing {run_dir}: {e}")
+        return None
+
+def plot_batch_physics_photometry(runs_dir="../runs", dpi=_BATCH_DPI, skip_up_to_date=False):
+    """Create physics-photometry correlation plots for batch runs, saved at dpi.
+    
+    With skip_up_to_date, skipped if the plot was last drawn by this same
+    script from the same set of run histories, none of them changed since.
+    """
     
     if not os.path.isdir(runs_dir):
         print(f"Error: Could not find runs directory: {runs_dir}")
         return
     
     # Find all run directories
-    run_dirs = [d for d in os.listdir(runs_dir) 
-                if d.startswith('inlist_M') and os.path.isdir(os.path.join(runs_dir, d))]
+    run_dirs = find_run_dirs(runs_dir)
     
     if not run_dirs:
         print("No batch run directories found")
@@ -344,87 +539,73 @@ def plot_batch_physics_photometry(runs_dir="../runs"):
     
     print(f"Found {len(run_dirs)} model runs")
     
-    # Collect data from all runs
-    all_data = []
-    
-    for run_dir in run_dirs:
-        history_path = os.path.join(runs_dir, run_dir, "LOGS", "history.data")
-        
-        if not os.path.exists(history_path):
-            continue
-        
-        try:
-            # Parse parameters
-            parts = run_dir.replace('inlist_M', '').split('_')
-            mass = float(parts[0])
-            
-            # Load data
-            md = mr.MesaData(history_path)
-            
-            # Get photometric system
-            all_cols, filter_columns = read_header_columns(history_path)
-            system = setup_primary_photometric_system(md, filter_columns)
-            
-            if system is None:
+    histories = [p for p in (os.path.join(runs_dir, d, "LOGS", "history.data") for d in run_dirs)
+                 if os.path.exists(p)]
+    stamp = _source_stamp(*histories)
+    
+    # The headers alone tell which system (and so which PNG) the plot uses
+    if skip_up_to_date:
+        systems = (setup_primary_photometric_system(None, read_header_columns(p)[1]) for p in histories)
+        system = next((sys_info for sys_info in systems if sys_info is not None), None)
+        if system is not None:
+            filename = f"plots/mass_scaling_{system['name'].lower()}.png"
+            if _up_to_date(filename, stamp):
+                print(f"{filename} is up to date with all runs, skipping")
+                return
+    
+    # Load every run in parallel; only the summary values come back
+    all_data = np.full(len(run_dirs), np.nan, dtype=_SUMMARY_DTYPE)
+    system = None
+    n_valid = 0
+    with ProcessPoolExecutor() as ex:
+        for final_data in ex.map(functools.partial(_process_run, runs_dir=runs_dir), run_dirs):
+            if final_data is None:
                 continue
-            
-            # Get final values for comparison
-            color, magnitude = get_color_magnitude_data(md, system)
-            
-            final_data = {
-                'mass': mass,
-                'color': color[-1],
-                'magnitude': magnitude[-1],
-                'system': system,
-                'md': md,
-                'run_dir': run_dir
-            }
-            
-            # Add physics parameters if available
-            if hasattr(md, 'log_center_T'):
-                final_data['final_center_T'] = md.log_center_T[-1]
-            if hasattr(md, 'log_center_Rho'):
-                final_data['final_center_Rho'] = md.log_center_Rho[-1]
-            if hasattr(md, 'log_L'):
-                final_data['final_log_L'] = md.log_L[-1]
-            if hasattr(md, 'log_Teff'):
-                final_data['final_log_Teff'] = md.log_Teff[-1]
-            
-            all_data.append(final_data)
-            
-        except Exception as e:
-            print(f"Error processing {run_dir}: {e}")
-            continue
+            if system is None:
+                system = final_data['system']
+            all_data[n_valid] = tuple(final_data.get(name, np.nan) for name in _SUMMARY_DTYPE.names)
+            n_valid += 1
     
-    if not all_data:
+    if not n_valid:
         print("No valid data found!")
         return
     
     # Create comparison plots
-    create_mass_scaling_plots(all_data)
+    create_mass_scaling_plots(all_data[:n_valid], system, dpi, stamp)
+
+def _linfit(x, y):
+    """Least-squares straight line through (x, y); returns (slope, intercept)."""
+    xm = x.mean()
+    ym = y.mean()
+    dx = x - xm
+    slope = (dx * (y - ym)).sum() / (dx * dx).sum()
+    return slope, ym - slope * xm
 
-def create_mass_scaling_plots(all_data):
-    """Create plots showing how photometric properties scale with stellar mass."""
+def create_mass_scaling_plots(all_data, system, dpi=_BATCH_DPI, stamp=None):
+    """Create plots showing how photometric properties scale with stellar mass.
+    
+    all_data is a _SUMMARY_DTYPE array with one row per run. stamp, if given,
+    is saved in the PNG for the skip_up_to_date check.
+    """
     
-    masses = np.array([d['mass'] for d in all_data])
-    colors = np.array([d['color'] for d in all_data])
-    magnitudes = np.array([d['magnitude'] for d in all_data])
+    masses = all_data['mass']
+    colors = all_data['color']
+    magnitudes = all_data['magnitude']
     
-    system_name = all_data[0]['system']['name']
-    color_name = all_data[0]['system']['primary_color']
-    mag_name = all_data[0]['system']['primary_mag']
+    system_name = system['name']
+    color_name = system['primary_color']
+    mag_name = system['primary_mag']
     
     fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 12))
     
     # Plot 1: Color vs Mass
-    ax1.scatter(masses, colors, s=100, alpha=0.7, color='blue')
+    ax1.scatter(masses, colors, s=100, alpha=0.7, color='blue', rasterized=True)
     
     # Fit trend line
     if len(masses) > 2:
-        z = np.polyfit(masses, colors, 1)
-        p = np.poly1d(z)
-        ax1.plot(masses, p(masses), 'r--', alpha=0.8, 
-                label=f'Slope: {z[0]:.3f} mag/M☉')
+        slope, intercept = _linfit(masses, colors)
+        ax1.plot(masses, slope * masses + intercept, 'r--', alpha=0.8, 
+                label=f'Slope: {slope:.3f} mag/M☉')
         ax1.legend()
     
     ax1.set_xlabel('Stellar Mass (M☉)')
@@ -433,13 +614,12 @@ def create_mass_scaling_plots(all_data):
     ax1.grid(alpha=0.3)
     
     # Plot 2: Magnitude vs Mass
-    ax2.scatter(masses, magnitudes, s=100, alpha=0.7, color='red')
+    ax2.scatter(masses, magnitudes, s=100, alpha=0.7, color='red', rasterized=True)
     
     if len(masses) > 2:
-        z = np.polyfit(masses, magnitudes, 1)
-        p = np.poly1d(z)
-        ax2.plot(masses, p(masses), 'b--', alpha=0.8, 
-                label=f'Slope: {z[0]:.3f} mag/M☉')
+        slope, intercept = _linfit(masses, magnitudes)
+        ax2.plot(masses, slope * masses + intercept, 'b--', alpha=0.8, 
+                label=f'Slope: {slope:.3f} mag/M☉')
         ax2.legend()
     
     ax2.set_xlabel('Stellar Mass (M☉)')
@@ -450,7 +630,7 @@ def create_mass_scaling_plots(all_data):
     
     # Plot 3: Color-Magnitude diagram colored by mass
     scatter = ax3.scatter(colors, magnitudes, c=masses, s=100, 
-                         cmap='viridis', alpha=0.8)
+                         cmap='viridis', alpha=0.8, rasterized=True)
     plt.colorbar(scatter, ax=ax3, label='Mass (M☉)')
     
     ax3.set_xlabel(f'{color_name}')
@@ -460,15 +640,15 @@ def create_mass_scaling_plots(all_data):
     ax3.grid(alpha=0.3)
     
     # Plot 4: Physics correlations (if available)
-    physics_available = any('final_log_L' in d for d in all_data)
+    log_L_vals = all_data['final_log_L']
+    valid_mask = ~np.isnan(log_L_vals)
+    physics_available = valid_mask.any()
     
     if physics_available:
-        log_L_vals = np.array([d.get('final_log_L', np.nan) for d in all_data])
-        valid_mask = ~np.isnan(log_L_vals)
-        
         if np.sum(valid_mask) > 1:
             scatter = ax4.scatter(colors[valid_mask], log_L_vals[valid_mask], 
-                                c=masses[valid_mask], s=100, cmap='plasma', alpha=0.8)
+                                c=masses[valid_mask], s=100, cmap='plasma', alpha=0.8, 
+                                rasterized=True)
             plt.colorbar(scatter, ax=ax4, label='Mass (M☉)')
             
             ax4.set_xlabel(f'{color_name}')
@@ -483,31 +663,38 @@ def create_mass_scaling_plots(all_data):
     # Save the plot
     os.makedirs("plots", exist_ok=True)
     filename = f"plots/mass_scaling_{system_name.lower()}.png"
-    plt.savefig(filename, dpi=300, bbox_inches='tight')
+    fig.savefig(filename, dpi=dpi, bbox_inches='tight', pil_kwargs=PNG_KWARGS,
+                metadata={_STAMP_KEY: stamp} if stamp else None)
     print(f"Saved: {filename}")
     
-    plt.show()
+    if HEADLESS:
+        plt.close(fig)
+    else:
+        plt.show()
 
 if __name__ == "__main__":
     print("MESA Custom Colors - Physics-Photometry Correlation Analysis")
     print("============================================================")
     
+    # Opt in to keeping plots already drawn by this script from unchanged data
+    skip = "--skip-up-to-date" in sys.argv[1:]
+    
     # Check for single model first
     if os.path.exists("LOGS/history.data"):
         print("Creating single model physics-photometry plots...")
-        plot_physics_photometry_single()
+        plot_physics_photometry_single(skip_up_to_date=skip)
     
     # Check for custom log directories
     log_dirs = glob.glob("LOGS_M*")
     if log_dirs:
         log_dir = log_dirs[0]
         print(f"Found custom log directory: {log_dir}")
-        plot_physics_photometry_single(log_dir)
+        plot_physics_photometry_single(log_dir, skip_up_to_date=skip)
     
     # Check for batch runs
     if os.path.exists("../runs"):
         print("Creating batch physics-photometry plots...")
-        plot_batch_physics_photometry("../runs")
+        plot_batch_physics_photometry("../runs", skip_up_to_date=skip)
     elif os.path.exists("runs"):
         print("Creating batch physics-photometry plots...")
-        plot_batch_physics_photometry("runs")
\ No newline at end of file
+        plot_batch_physics_photometry("runs", skip_up_to_date=skip)
\ No newline at end of file
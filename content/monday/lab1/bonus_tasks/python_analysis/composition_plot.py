@@ -5,28 +5,57 @@ Shows relationship between stellar composition and photometric properties
 """
 
 import os
+import functools
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
+from mesa_figures import HEADLESS, PNG_KWARGS
+
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
 import mesa_reader as mr
-import glob
+from mesa_runs import find_run_dirs, parse_run_name
+from mesa_cache import h5_cache
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+# Screen-quality output
+_DPI = 150
 
-def read_header_columns(history_file):
-    """Read column headers from history file to find available filters."""
-    header_line = None
-    with open(history_file, "r") as fp:
-        for line in fp:
-            if "model_number" in line:
-                header_line = line.strip()
-                break
-    
-    if header_line is None:
-        print("Warning: Could not find header line with 'model_number'")
-        return [], []
-    
-    # Split the header line on whitespace
-    all_cols = header_line.split()
-    
-    # Find the index of Flux_bol
+def find_latest_profile(logs_dir):
+    """Path of the highest-numbered profile<N>.data in logs_dir, or None."""
+    best_num, best_path = -1, None
+    try:
+        entries = os.scandir(logs_dir)
+    except OSError:
+        return None
+    with entries:
+        for entry in entries:
+            name = entry.name
+            if name.startswith('profile') and name.endswith('.data'):
+                try:
+                    num = int(name[7:-5])
+                except ValueError:
+                    continue
+                if num > best_num:
+                    best_num, best_path = num, entry.path
+    return best_path
+
+@functools.lru_cache(maxsize=256)
+def _load_mesa(path, mtime):
+    """Load a MESA output file; mtime is only part of the cache key."""
+    return mr.MesaData(path)
+
+def header_columns_from_data(md):
+    """Column names and filter columns of an already loaded MesaData history.
+    
+    Found from the loaded table, without opening the file again.
+    """
+    all_cols = list(md.bulk_names)
     try:
         flux_index = all_cols.index("Flux_bol")
         filter_columns = all_cols[flux_index + 1:]
@@ -36,6 +65,10 @@ def read_header_columns(history_file):
     
     return all_cols, filter_columns
 
+# Per-run arrays and labels for the batch plots (None where a column is missing)
+Run = namedtuple('Run', 'mass scheme fov color linestyle mass_coord xH age_myr surH surZ '
+                        'color_index magnitude color_label mag_label system')
+
 def setup_color_params(md, filter_columns):
     """Set up color parameters based on available filters."""
     
@@ -89,7 +122,48 @@ def setup_color_params(md, filter_columns):
     
     return color_index, magnitude, color_label, mag_label, system
 
-def plot_single_composition_analysis(logs_path="LOGS"):
+# Histories are thinned to about this many points before plotting
+_MAX_HISTORY_POINTS = 4000
+
+# History columns the single-run plots use
+_HISTORY_COLUMNS = ('star_age', 'surface_h1', 'surface_he4', 'surface_z', 'center_h1')
+
+def _f32(a):
+    """Contiguous float32 copy of a plotted column (plenty of precision for plots)."""
+    return np.ascontiguousarray(a, dtype=np.float32)
+
+def _thin(n, max_pts=_MAX_HISTORY_POINTS):
+    """Indices picking at most max_pts of n history rows, first and last included."""
+    if n <= max_pts:
+        return slice(None)
+    return np.linspace(0, n - 1, max_pts).astype(np.intp)
+
+def _draw_comp_profile(ax, mass_coord, profile, pcols, fontsize=12):
+    """Draw the H/He/Z mass-fraction profile of a MESA profile onto ax.
+    
+    pcols is the set of the profile's column names.
+    """
+    ax.plot(mass_coord, profile.x_mass_fraction_H, '-', 
+            color='blue', linewidth=2, label='Hydrogen')
+    
+    # Add helium if available
+    if 'y_mass_fraction_He' in pcols:
+        ax.plot(mass_coord, profile.y_mass_fraction_He, '-', 
+                color='red', linewidth=2, label='Helium')
+    
+    # Add metals if available
+    if 'z_mass_fraction_metals' in pcols:
+        ax.plot(mass_coord, profile.z_mass_fraction_metals, '-', 
+                color='green', linewidth=2, label='Metals')
+    
+    ax.set_xlabel("Mass Coordinate (m/M$_{\\rm star}$)", fontsize=fontsize)
+    ax.set_ylabel("Mass Fraction", fontsize=fontsize)
+    ax.legend(loc='best')
+    ax.grid(alpha=0.3)
+    ax.set_xlim(0, 1)
+    ax.set_ylim(0, 1)
+
+def plot_single_composition_analysis(logs_path="LOGS", show=True):
     """Create enhanced composition analysis plots for a single MESA run"""
     
     # Check if the LOGS directory exists
@@ -98,74 +172,76 @@ def plot_single_composition_analysis(logs_path="LOGS"):
         return
         
     # Try to find the latest profile file
-    profile_files = sorted(glob.glob(os.path.join(logs_path, "profile*.data")))
+    profile_file = find_latest_profile(logs_path)
     
-    if not profile_files:
+    if profile_file is None:
         print(f"Error: Could not find any profile files in {logs_path}")
         return
         
     # Also try to load history file for color evolution
     history_path = os.path.join(logs_path, "history.data")
     history_data = None
+    arrs = {}
     if os.path.exists(history_path):
         try:
-            history_data = mr.MesaData(history_path)
-            all_cols, filter_columns = read_header_columns(history_path)
+            mtime = os.path.getmtime(history_path)
+            history_data = _load_mesa(history_path, mtime)
+            all_cols, filter_columns = header_columns_from_data(history_data)
             color_index, magnitude, color_label, mag_label, system = setup_color_params(history_data, filter_columns)
+            
+            # Thin every plotted history array with the same indices, once, into
+            # contiguous copies the plots below use directly
+            sl = _thin(len(history_data.bulk_data))
+            hcols = set(history_data.bulk_names)
+            arrs = {name: _f32(history_data.data(name)[sl])
+                    for name in _HISTORY_COLUMNS if name in hcols}
+            if 'star_age' in arrs:
+                arrs['age_myr'] = arrs.pop('star_age') / 1e6
+            if color_index is not None:
+                color_index, magnitude = _f32(color_index[sl]), _f32(magnitude[sl])
         except Exception as e:
             print(f"Warning: Could not load history data: {e}")
             history_data = None
+            arrs = {}
         
     try:
         # Load the last profile
-        latest_profile = mr.MesaData(profile_files[-1])
+        latest_profile = _load_mesa(profile_file, os.path.getmtime(profile_file))
+        
+        # Column availability as a set, so each check below is one lookup
+        pcols = set(latest_profile.bulk_names)
+        
+        # Normalized mass coordinate, shared by Plot 1 and composition_profile.png
+        mass_coord = None
+        if 'mass' in pcols and 'x_mass_fraction_H' in pcols:
+            mass_coord = _f32(latest_profile.mass / latest_profile.star_mass)
         
         # Create enhanced composition analysis
         fig, axes = plt.subplots(2, 2, figsize=(15, 12))
         fig.suptitle("Enhanced Composition Analysis", fontsize=16)
         
         # Plot 1: Traditional composition profile
-        if hasattr(latest_profile, 'mass') and hasattr(latest_profile, 'x_mass_fraction_H'):
-            mass_coord = latest_profile.mass / latest_profile.star_mass
-            
-            axes[0, 0].plot(mass_coord, latest_profile.x_mass_fraction_H, '-', 
-                           color='blue', linewidth=2, label='Hydrogen')
-            
-            # Add helium if available
-            if hasattr(latest_profile, 'y_mass_fraction_He'):
-                axes[0, 0].plot(mass_coord, latest_profile.y_mass_fraction_He, '-', 
-                               color='red', linewidth=2, label='Helium')
-            
-            # Add metals if available
-            if hasattr(latest_profile, 'z_mass_fraction_metals'):
-                axes[0, 0].plot(mass_coord, latest_profile.z_mass_fraction_metals, '-', 
-                               color='green', linewidth=2, label='Metals')
-            
-            axes[0, 0].set_xlabel("Mass Coordinate (m/M$_{\\rm star}$)", fontsize=12)
-            axes[0, 0].set_ylabel("Mass Fraction", fontsize=12)
+        if mass_coord is not None:
+            _draw_comp_profile(axes[0, 0], mass_coord, latest_profile, pcols)
             axes[0, 0].set_title("Composition Profile (Final Model)", fontsize=14)
-            axes[0, 0].legend()
-            axes[0, 0].grid(alpha=0.3)
-            axes[0, 0].set_xlim(0, 1)
-            axes[0, 0].set_ylim(0, 1)
         else:
             axes[0, 0].text(0.5, 0.5, "Composition data\nnot available", 
                            ha='center', va='center', transform=axes[0, 0].transAxes)
         
         # Plot 2: Surface composition evolution vs time (if history available)
         if history_data is not None:
-            if hasattr(history_data, 'star_age') and hasattr(history_data, 'surface_h1'):
-                age_myr = history_data.star_age / 1e6
+            if 'age_myr' in arrs and 'surface_h1' in arrs:
+                age_myr = arrs['age_myr']
                 
-                axes[0, 1].plot(age_myr, history_data.surface_h1, '-', 
+                axes[0, 1].plot(age_myr, arrs['surface_h1'], '-', 
                                color='blue', linewidth=2, label='Surface H')
                 
-                if hasattr(history_data, 'surface_he4'):
-                    axes[0, 1].plot(age_myr, history_data.surface_he4, '-', 
+                if 'surface_he4' in arrs:
+                    axes[0, 1].plot(age_myr, arrs['surface_he4'], '-', 
                                    color='red', linewidth=2, label='Surface He')
                 
-                if hasattr(history_data, 'surface_z'):
-                    axes[0, 1].plot(age_myr, history_data.surface_z, '-', 
+                if 'surface_z' in arrs:
+                    axes[0, 1].plot(age_myr, arrs['surface_z'], '-', 
                                    color='green', linewidth=2, label='Surface Z')
                 
                 axes[0, 1].set_xlabel("Age (Myr)", fontsize=12)
@@ -182,18 +258,18 @@ def plot_single_composition_analysis(logs_path="LOGS"):
         
         # Plot 3: Color evolution vs composition (if color data available)
         if history_data is not None and color_index is not None:
-            if hasattr(history_data, 'surface_h1'):
+            if 'surface_h1' in arrs:
                 # Color by evolutionary phase if available
-                if hasattr(history_data, 'center_h1'):
-                    scatter = axes[1, 0].scatter(history_data.surface_h1, color_index,
-                                               c=history_data.center_h1, cmap='viridis',
-                                               s=30, alpha=0.7)
+                if 'center_h1' in arrs:
+                    scatter = axes[1, 0].scatter(arrs['surface_h1'], color_index,
+                                               c=arrs['center_h1'], cmap='viridis',
+                                               s=30, alpha=0.7, rasterized=True, linewidths=0)
                     plt.colorbar(scatter, ax=axes[1, 0], label='Central H fraction')
                 else:
-                    axes[1, 0].scatter(history_data.surface_h1, color_index, 
-                                     color='purple', s=30, alpha=0.7)
-                    axes[1, 0].plot(history_data.surface_h1, color_index, '-', 
-                                   color='purple', alpha=0.5, linewidth=1)
+                    # Markers and connecting line in a single artist
+                    axes[1, 0].plot(arrs['surface_h1'], color_index, 'o-', color='purple',
+                                   markersize=5, markeredgewidth=0, alpha=0.7, linewidth=1,
+                                   rasterized=True)
                 
                 axes[1, 0].set_xlabel("Surface H Mass Fraction", fontsize=12)
                 axes[1, 0].set_ylabel(f"{color_label}", fontsize=12)
@@ -208,18 +284,17 @@ def plot_single_composition_analysis(logs_path="LOGS"):
         
         # Plot 4: Metallicity evolution vs magnitude (if available)
         if history_data is not None and magnitude is not None:
-            if hasattr(history_data, 'surface_z'):
+            if 'surface_z' in arrs:
                 # Color by evolutionary phase if available
-                if hasattr(history_data, 'center_h1'):
-                    scatter = axes[1, 1].scatter(history_data.surface_z, magnitude,
-                                               c=history_data.center_h1, cmap='viridis',
-                                               s=30, alpha=0.7)
+                if 'center_h1' in arrs:
+                    scatter = axes[1, 1].scatter(arrs['surface_z'], magnitude,
+                                               c=arrs['center_h1'], cmap='viridis',
+                                               s=30, alpha=0.7, rasterized=True, linewidths=0)
                     plt.colorbar(scatter, ax=axes[1, 1], label='Central H fraction')
                 else:
-                    axes[1, 1].scatter(history_data.surface_z, magnitude, 
-                                     color='orange', s=30, alpha=0.7)
-                    axes[1, 1].plot(history_data.surface_z, magnitude, '-', 
-                                   color='orange', alpha=0.5, linewidth=1)
+                    axes[1, 1].plot(arrs['surface_z'], magnitude, 'o-', color='orange',
+                                   markersize=5, markeredgewidth=0, alpha=0.7, linewidth=1,
+                                   rasterized=True)
                 
                 axes[1, 1].set_xlabel("Surface Metallicity (Z)", fontsize=12)
                 axes[1, 1].set_ylabel(f"{mag_label}", fontsize=12)
@@ -236,38 +311,25 @@ def plot_single_composition_analysis(logs_path="LOGS"):
         # Save and show
         os.makedirs("plots", exist_ok=True)
         plt.tight_layout()
-        plt.savefig("plots/composition_analysis_enhanced.png", dpi=300, bbox_inches='tight')
+        plt.savefig("plots/composition_analysis_enhanced.png", dpi=_DPI, bbox_inches='tight', pil_kwargs=PNG_KWARGS)
         print(f"Saved enhanced composition analysis to plots/composition_analysis_enhanced.png")
-        plt.show()
+        if show and not HEADLESS:
+            plt.show()
+        plt.close(fig)
         
         # Create traditional composition profile plot for compatibility
-        if hasattr(latest_profile, 'mass') and hasattr(latest_profile, 'x_mass_fraction_H'):
-            plt.figure(figsize=(10, 8))
-            mass_coord = latest_profile.mass / latest_profile.star_mass
-            
-            plt.plot(mass_coord, latest_profile.x_mass_fraction_H, '-', 
-                    color='blue', linewidth=2, label='Hydrogen')
-            
-            if hasattr(latest_profile, 'y_mass_fraction_He'):
-                plt.plot(mass_coord, latest_profile.y_mass_fraction_He, '-', 
-                        color='red', linewidth=2, label='Helium')
-            
-            if hasattr(latest_profile, 'z_mass_fraction_metals'):
-                plt.plot(mass_coord, latest_profile.z_mass_fraction_metals, '-', 
-                        color='green', linewidth=2, label='Metals')
-            
-            plt.xlabel("Mass Coordinate (m/M$_{\\rm star}$)", fontsize=14)
-            plt.ylabel("Mass Fraction", fontsize=14)
+        if mass_coord is not None:
+            # Same curves as Plot 1, redrawn on their own figure
+            prof_fig = plt.figure(figsize=(10, 8))
+            _draw_comp_profile(plt.gca(), mass_coord, latest_profile, pcols, fontsize=14)
             plt.title("Composition Profile at Final Model", fontsize=16)
-            plt.legend(loc='best')
-            plt.grid(alpha=0.3)
-            plt.xlim(0, 1)
-            plt.ylim(0, 1)
             
             plt.tight_layout()
-            plt.savefig("plots/composition_profile.png", dpi=300)
+            plt.savefig("plots/composition_profile.png", dpi=_DPI, pil_kwargs=PNG_KWARGS)
             print(f"Saved composition profile to plots/composition_profile.png")
-            plt.show()
+            if show and not HEADLESS:
+                plt.show()
+            plt.close(prof_fig)
         
         return True
         
@@ -275,8 +337,130 @@ def plot_single_composition_analysis(logs_path="LOGS"):
         print(f"Error creating composition analysis plots: {e}")
         return False
 
-def plot_batch_composition_analysis():
-    """Create composition analysis plots for batch runs"""
+class _H5Columns:
+    """Read-only, MesaData-like view of an open mesa_cache.h5_cache file.
+    
+    Columns are read from disk on first access, bulk columns before header
+    values, as MesaData does.
+    """
+    
+    def __init__(self, f):
+        self._f = f
+        self.bulk_names = tuple(f.attrs["bulk_names"])
+    
+    def data(self, name):
+        return self._f[name][()]
+    
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name in self._f:
+            return self._f[name][()]
+        if "header:" + name in self._f.attrs:
+            return self._f.attrs["header:" + name]
+        raise AttributeError(name)
+
+@functools.lru_cache(maxsize=256)
+def _load_run(history_path, history_mtime, profile_path, profile_mtime, mass, scheme, fov):
+    """Load one batch run into a Run; the mtimes are only part of the cache key.
+    
+    With h5py installed the files are read through their HDF5 caches, so only
+    the plotted columns are loaded; otherwise the text files are parsed.
+    """
+    if h5py is not None:
+        try:
+            history_h5 = h5_cache(history_path)
+            profile_h5 = h5_cache(profile_path)
+        except OSError as e:
+            print(f"Warning: Could not write HDF5 cache, reading text files: {e}")
+        else:
+            with h5py.File(history_h5, "r") as hf, h5py.File(profile_h5, "r") as pf:
+                return _extract_run(_H5Columns(hf), _H5Columns(pf), mass, scheme, fov)
+    
+    return _extract_run(mr.MesaData(history_path), mr.MesaData(profile_path), mass, scheme, fov)
+
+def _extract_run(history_data, profile_data, mass, scheme, fov):
+    """Build a Run from a loaded history and profile.
+    
+    Only copies of the plotted arrays are kept, so the loaded objects (and
+    their full column tables) are freed as soon as the caller drops them.
+    """
+    pcols = set(profile_data.bulk_names)
+    hcols = set(history_data.bulk_names)
+    
+    # Get filter information
+    all_cols, filter_columns = header_columns_from_data(history_data)
+    color_index, magnitude, color_label, mag_label, system = setup_color_params(history_data, filter_columns)
+    
+    # Column attributes are views into bulk_data; _f32 copies them so it can be released
+    mass_coord = x_H = None
+    if 'mass' in pcols and 'x_mass_fraction_H' in pcols:
+        mass_coord = _f32(profile_data.mass / profile_data.star_mass)
+        x_H = _f32(profile_data.x_mass_fraction_H)
+    
+    sl = _thin(len(history_data.data('model_number')))
+    age_myr = _f32(history_data.star_age[sl] / 1e6) if 'star_age' in hcols else None
+    surface_h1 = _f32(history_data.surface_h1[sl]) if 'surface_h1' in hcols else None
+    surface_z = _f32(history_data.surface_z[sl]) if 'surface_z' in hcols else None
+    if color_index is not None:
+        color_index, magnitude = _f32(color_index[sl]), _f32(magnitude[sl])
+    
+    # color and linestyle are filled in once every run is known
+    return Run(mass, scheme, fov, None, None,
+               mass_coord, x_H, age_myr, surface_h1, surface_z,
+               color_index, magnitude, color_label, mag_label, system)
+
+def _draw_run_lines(ax, runs, x_field, y_field, labels=None):
+    """Draw the x_field/y_field curve of every run as one LineCollection on ax.
+    
+    Runs missing either field are skipped. If labels (one per run) are given,
+    matching Line2D legend handles are returned.
+    """
+    pairs = [(run, label) for run, label in zip(runs, labels or [None] * len(runs))
+             if getattr(run, x_field) is not None and getattr(run, y_field) is not None]
+    if not pairs:
+        return []
+    
+    lc = LineCollection([np.column_stack([getattr(run, x_field), getattr(run, y_field)])
+                         for run, _ in pairs],
+                        colors=[run.color for run, _ in pairs],
+                        linestyles=[run.linestyle for run, _ in pairs],
+                        linewidths=2, alpha=0.8)
+    ax.add_collection(lc)
+    ax.autoscale_view()
+    
+    if labels is None:
+        return []
+    return [Line2D([0], [0], color=run.color, linestyle=run.linestyle, linewidth=2,
+                   alpha=0.8, label=label) for run, label in pairs]
+
+def _load_one(runs_dir, run_dir):
+    """Parse a batch run's parameters and load it; None if it can't be used."""
+    history_path = os.path.join(runs_dir, run_dir, "LOGS", "history.data")
+    profile_file = find_latest_profile(os.path.join(runs_dir, run_dir, "LOGS"))
+    
+    if not os.path.exists(history_path) or profile_file is None:
+        print(f"Warning: Missing files in {run_dir}")
+        return None
+        
+    try:
+        # Parse parameters from directory name
+        params = parse_run_name(run_dir)
+        if params is None:
+            raise ValueError(f"unrecognised run directory name '{run_dir}'")
+        mass, scheme, fov = params['mass'], params['scheme'], params['fov']
+            
+        # Load data
+        return _load_run(history_path, os.path.getmtime(history_path),
+                         profile_file, os.path.getmtime(profile_file),
+                         mass, scheme, fov)
+            
+    except Exception as e:
+        print(f"Error processing {run_dir}: {e}")
+        return None
+
+def plot_batch_composition_analysis(show=False):
+    """Create composition analysis plots for batch runs (saved only, unless show)"""
     
     runs_dir = "../runs"
     if not os.path.isdir(runs_dir):
@@ -284,80 +468,29 @@ def plot_batch_composition_analysis():
         return False
         
     # Find all run directories
-    run_dirs = [d for d in os.listdir(runs_dir) 
-                if os.path.isdir(os.path.join(runs_dir, d)) and d.startswith("inlist_")]
+    run_dirs = find_run_dirs(runs_dir)
     
     if not run_dirs:
         print("No batch run directories found")
         return False
         
-    # Parse run parameters and collect data
-    all_data = []
-    colors_mass = {}
-    linestyles_scheme = {}
-    
-    for run_dir in run_dirs:
-        history_path = os.path.join(runs_dir, run_dir, "LOGS", "history.data")
-        profile_files = sorted(glob.glob(os.path.join(runs_dir, run_dir, "LOGS", "profile*.data")))
-        
-        if not os.path.exists(history_path) or not profile_files:
-            print(f"Warning: Missing files in {run_dir}")
-            continue
-            
-        try:
-            # Parse parameters from directory name
-            parts = run_dir.replace('inlist_M', '').split('_')
-            mass = float(parts[0])
-            metallicity = float(parts[1][1:])  # Remove 'Z'
-            
-            if 'noovs' in run_dir:
-                scheme = 'none'
-                fov = 0.0
-            else:
-                scheme = parts[2]
-                fov = float(parts[3][3:])  # Remove 'fov'
-                
-            # Load data
-            history_data = mr.MesaData(history_path)
-            profile_data = mr.MesaData(profile_files[-1])
-            
-            # Get filter information
-            all_cols, filter_columns = read_header_columns(history_path)
-            color_index, magnitude, color_label, mag_label, system = setup_color_params(history_data, filter_columns)
-            
-            # Store data
-            run_info = {
-                'history_data': history_data,
-                'profile_data': profile_data,
-                'mass': mass,
-                'metallicity': metallicity,
-                'scheme': scheme,
-                'fov': fov,
-                'color_index': color_index,
-                'magnitude': magnitude,
-                'color_label': color_label,
-                'mag_label': mag_label,
-                'system': system,
-                'run_dir': run_dir
-            }
-            all_data.append(run_info)
-            
-            # Assign colors by mass
-            if mass not in colors_mass:
-                colors_mass[mass] = plt.cm.viridis(len(colors_mass) / 10.0)
-                
-            # Assign line styles by scheme
-            if scheme not in linestyles_scheme:
-                styles = ['-', '--', '-.', ':']
-                linestyles_scheme[scheme] = styles[len(linestyles_scheme) % len(styles)]
-                
-        except Exception as e:
-            print(f"Error processing {run_dir}: {e}")
-            continue
+    # Runs are independent, so load them on a thread pool (map keeps their order)
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+        all_data = [run for run in ex.map(functools.partial(_load_one, runs_dir), run_dirs)
+                    if run is not None]
     
     if not all_data:
         print("No valid data found in batch runs")
         return False
+    
+    # Colors by mass and line styles by scheme, assigned in sorted order
+    masses = sorted({r.mass for r in all_data})
+    colors_mass = dict(zip(masses, plt.cm.viridis(np.linspace(0.05, 0.95, len(masses)))))
+    styles = ['-', '--', '-.', ':']
+    schemes = sorted({r.scheme for r in all_data})
+    linestyles_scheme = {scheme: styles[i % len(styles)] for i, scheme in enumerate(schemes)}
+    all_data = [r._replace(color=colors_mass[r.mass], linestyle=linestyles_scheme[r.scheme])
+                for r in all_data]
         
     print(f"Creating batch composition analysis for {len(all_data)} models")
     
@@ -366,41 +499,26 @@ def plot_batch_composition_analysis():
     fig.suptitle("Batch Composition Analysis", fontsize=16)
     
     # Plot 1: Final hydrogen profiles
-    for run_info in all_data:
-        color = colors_mass[run_info['mass']]
-        linestyle = linestyles_scheme[run_info['scheme']]
-        
-        label = f"M={run_info['mass']}M☉"
-        if run_info['scheme'] != 'none':
-            label += f", {run_info['scheme']}"
+    labels = []
+    for run in all_data:
+        label = f"M={run.mass}M☉"
+        if run.scheme != 'none':
+            label += f", {run.scheme}"
         else:
             label += ", no ovs"
-        
-        profile = run_info['profile_data']
-        if hasattr(profile, 'mass') and hasattr(profile, 'x_mass_fraction_H'):
-            mass_coord = profile.mass / profile.star_mass
-            axes[0, 0].plot(mass_coord, profile.x_mass_fraction_H,
-                           color=color, linestyle=linestyle, linewidth=2,
-                           label=label, alpha=0.8)
+        labels.append(label)
+    handles = _draw_run_lines(axes[0, 0], all_data, 'mass_coord', 'xH', labels)
     
     axes[0, 0].set_xlabel("Mass Coordinate (m/M$_{\\rm star}$)", fontsize=12)
     axes[0, 0].set_ylabel("Hydrogen Mass Fraction", fontsize=12)
     axes[0, 0].set_title("Final Hydrogen Profiles", fontsize=14)
     axes[0, 0].grid(alpha=0.3)
-    axes[0, 0].legend(bbox_to_anchor=(1.05, 1), loc='upper left', fontsize=8)
+    axes[0, 0].legend(handles=handles, bbox_to_anchor=(1.05, 1), loc='upper left', fontsize=8)
     axes[0, 0].set_xlim(0, 1)
     axes[0, 0].set_ylim(0, 1)
     
     # Plot 2: Surface composition evolution
-    for run_info in all_data:
-        color = colors_mass[run_info['mass']]
-        linestyle = linestyles_scheme[run_info['scheme']]
-        
-        history = run_info['history_data']
-        if hasattr(history, 'star_age') and hasattr(history, 'surface_h1'):
-            age_myr = history.star_age / 1e6
-            axes[0, 1].plot(age_myr, history.surface_h1,
-                           color=color, linestyle=linestyle, linewidth=2, alpha=0.8)
+    _draw_run_lines(axes[0, 1], all_data, 'age_myr', 'surH')
     
     axes[0, 1].set_xlabel("Age (Myr)", fontsize=12)
     axes[0, 1].set_ylabel("Surface H Mass Fraction", fontsize=12)
@@ -408,41 +526,27 @@ def plot_batch_composition_analysis():
     axes[0, 1].grid(alpha=0.3)
     
     # Plot 3 & 4: Color-composition relationships for models with photometry
-    models_with_colors = [r for r in all_data if r['color_index'] is not None]
+    models_with_colors = [r for r in all_data if r.color_index is not None]
     
     if models_with_colors:
         # Determine primary photometric system
-        systems = [r['system'] for r in models_with_colors]
+        systems = [r.system for r in models_with_colors]
         primary_system = max(set(systems), key=systems.count)
-        primary_models = [r for r in models_with_colors if r['system'] == primary_system]
+        primary_models = [r for r in models_with_colors if r.system == primary_system]
         
         # Plot 3: Surface H vs Color
-        for run_info in primary_models:
-            color = colors_mass[run_info['mass']]
-            linestyle = linestyles_scheme[run_info['scheme']]
-            
-            history = run_info['history_data']
-            if hasattr(history, 'surface_h1'):
-                axes[1, 0].plot(history.surface_h1, run_info['color_index'],
-                               color=color, linestyle=linestyle, linewidth=2, alpha=0.8)
+        _draw_run_lines(axes[1, 0], primary_models, 'surH', 'color_index')
         
         axes[1, 0].set_xlabel("Surface H Mass Fraction", fontsize=12)
-        axes[1, 0].set_ylabel(f"{primary_models[0]['color_label']}", fontsize=12)
+        axes[1, 0].set_ylabel(f"{primary_models[0].color_label}", fontsize=12)
         axes[1, 0].set_title(f"Surface H vs {primary_system} Color", fontsize=14)
         axes[1, 0].grid(alpha=0.3)
         
         # Plot 4: Surface Z vs Magnitude
-        for run_info in primary_models:
-            color = colors_mass[run_info['mass']]
-            linestyle = linestyles_scheme[run_info['scheme']]
-            
-            history = run_info['history_data']
-            if hasattr(history, 'surface_z') and run_info['magnitude'] is not None:
-                axes[1, 1].plot(history.surface_z, run_info['magnitude'],
-                               color=color, linestyle=linestyle, linewidth=2, alpha=0.8)
+        _draw_run_lines(axes[1, 1], primary_models, 'surZ', 'magnitude')
         
         axes[1, 1].set_xlabel("Surface Metallicity (Z)", fontsize=12)
-        axes[1, 1].set_ylabel(f"{primary_models[0]['mag_label']}", fontsize=12)
+        axes[1, 1].set_ylabel(f"{primary_models[0].mag_label}", fontsize=12)
         axes[1, 1].invert_yaxis()
         axes[1, 1].set_title(f"Surface Z vs {primary_system} Magnitude", fontsize=14)
         axes[1, 1].grid(alpha=0.3)
@@ -454,38 +558,35 @@ def plot_batch_composition_analysis():
     
     os.makedirs("plots", exist_ok=True)
     plt.tight_layout()
-    plt.savefig("plots/composition_analysis_batch.png", dpi=300, bbox_inches='tight')
+    plt.savefig("plots/composition_analysis_batch.png", dpi=_DPI, bbox_inches='tight', pil_kwargs=PNG_KWARGS)
     print(f"Saved batch composition analysis to plots/composition_analysis_batch.png")
-    plt.show()
+    if show and not HEADLESS:
+        plt.show()
+    plt.close(fig)
     
     # Create separate hydrogen profiles plot
-    plt.figure(figsize=(12, 8))
-    for run_info in all_data:
-        color = colors_mass[run_info['mass']]
-        linestyle = linestyles_scheme[run_info['scheme']]
-        
-        label = f"M={run_info['mass']}M☉, {run_info['scheme']}"
-        if run_info['fov'] > 0:
-            label += f" (f_ov={run_info['fov']})"
-        
-        profile = run_info['profile_data']
-        if hasattr(profile, 'mass') and hasattr(profile, 'x_mass_fraction_H'):
-            mass_coord = profile.mass / profile.star_mass
-            plt.plot(mass_coord, profile.x_mass_fraction_H,
-                    color=color, linestyle=linestyle, linewidth=2,
-                    label=label, alpha=0.8)
+    fig = plt.figure(figsize=(12, 8))
+    labels = []
+    for run in all_data:
+        label = f"M={run.mass}M☉, {run.scheme}"
+        if run.fov > 0:
+            label += f" (f_ov={run.fov})"
+        labels.append(label)
+    handles = _draw_run_lines(plt.gca(), all_data, 'mass_coord', 'xH', labels)
     
     plt.xlabel("Mass Coordinate (m/M$_{\\rm star}$)", fontsize=14)
     plt.ylabel("Hydrogen Mass Fraction", fontsize=14)
     plt.title("Final Hydrogen Profiles (All Models)", fontsize=16)
     plt.grid(alpha=0.3)
-    plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
+    plt.legend(handles=handles, bbox_to_anchor=(1.05, 1), loc='upper left')
     plt.xlim(0, 1)
     plt.ylim(0, 1)
     plt.tight_layout()
-    plt.savefig("plots/hydrogen_profiles_all_models.png", dpi=300, bbox_inches='tight')
+    plt.savefig("plots/hydrogen_profiles_all_models.png", dpi=_DPI, bbox_inches='tight', pil_kwargs=PNG_KWARGS)
     print(f"Saved hydrogen profiles to plots/hydrogen_profiles_all_models.png")
-    plt.show()
+    if show and not HEADLESS:
+        plt.show()
+    plt.close(fig)
     
     return True
 
@@ -5,60 +5,200 @@ Shows relationship between core evolution and photometric properties
 """
 
 import os
+import itertools
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
+import pandas as pd
+from mesa_figures import HEADLESS, PNG_KWARGS
+
 import matplotlib.pyplot as plt
-import mesa_reader as mr
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
 import glob
+from mesa_runs import find_run_dirs, parse_run_name
+from mesa_cache import HistoryData, h5_cache, read_mesa_table
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+# Point clouds above these sizes are drawn as one raster layer (at savefig dpi)
+# instead of individually shaded vector markers / path segments
+_RASTER_SCATTER_POINTS = 2000
+_RASTER_LINE_POINTS = 5000
 
-def read_header_columns(history_file):
-    """Read column headers from history file to find available filters."""
-    header_line = None
-    with open(history_file, "r") as fp:
-        for line in fp:
-            if "model_number" in line:
-                header_line = line.strip()
-                break
-    
-    if header_line is None:
-        print("Warning: Could not find header line with 'model_number'")
-        return [], []
-    
-    # Split the header line on whitespace
-    all_cols = header_line.split()
-    
-    # Find the index of Flux_bol
+# Curves longer than this are LTTB-downsampled before plotting
+_MAX_PLOT_POINTS = 4000
+
+def _save_figure(fig, filename, **savefig_kwargs):
+    """Save a figure to filename at the standard 300 dpi."""
+    fig.savefig(filename, dpi=300, pil_kwargs=PNG_KWARGS, **savefig_kwargs)
+
+def _output_figure(fig, filename, message, **savefig_kwargs):
+    """Save fig, show it when there's a display, then close it."""
+    _save_figure(fig, filename, **savefig_kwargs)
+    print(message)
+    if not HEADLESS:
+        plt.show()
+    plt.close(fig)
+
+def _split_filter_columns(all_cols):
+    """Filter columns are the ones after Flux_bol."""
     try:
         flux_index = all_cols.index("Flux_bol")
-        filter_columns = all_cols[flux_index + 1:]
+        return all_cols[flux_index + 1:]
     except ValueError:
         print("Warning: Could not find 'Flux_bol' column in header")
-        filter_columns = []
+        return []
+
+# Core mass columns in order of preference
+_CORE_MASS_ATTRS = ('he_core_mass', 'mass_conv_core', 'conv_mx1_top')
+
+# Non-filter columns the batch plots read
+_BATCH_COLUMNS = ('model_number', 'star_age', 'star_mass') + _CORE_MASS_ATTRS
+
+def _fast_load_history(history_path, columns=None):
+    """Load a MESA history file with mesa_cache's pandas reader instead of mr.MesaData.
+    
+    If columns is given, only those (where present) and the filter columns
+    are parsed. Returns (md, all_cols, filter_columns).
+    """
+    filter_columns = []
+    
+    def select(all_cols):
+        filter_columns.extend(_split_filter_columns(all_cols))
+        if columns is None:
+            return None
+        keep = set(columns).union(filter_columns)
+        return [name for name in all_cols if name in keep]
+    
+    header, all_cols, df = read_mesa_table(history_path, select)
+    return HistoryData(df, header), all_cols, filter_columns
+
+def _load_history(history_path, columns=None):
+    """Load a history file like _fast_load_history, through its HDF5 cache
+    when h5py is installed (only the requested columns are then read).
+    """
+    if h5py is not None:
+        try:
+            h5_path = h5_cache(history_path)
+        except OSError as e:
+            print(f"Warning: Could not write HDF5 cache, reading text file: {e}")
+        else:
+            with h5py.File(h5_path, "r") as f:
+                all_cols = list(f.attrs["bulk_names"])
+                filter_columns = _split_filter_columns(all_cols)
+                names = all_cols
+                if columns is not None:
+                    keep = set(columns).union(filter_columns)
+                    names = [name for name in all_cols if name in keep]
+                df = pd.DataFrame({name: f[name][()] for name in names})
+                header = {key[len("header:"):]: value for key, value in f.attrs.items()
+                          if key.startswith("header:")}
+            return HistoryData(df, header), all_cols, filter_columns
+    
+    return _fast_load_history(history_path, columns=columns)
+
+def _f32(a):
+    """Owned float32 copy of a plotted column (plenty of precision for plots)."""
+    return None if a is None else np.array(a, dtype=np.float32)
+
+def _lttb(x, y, n_out=_MAX_PLOT_POINTS):
+    """Indices of a largest-triangle-three-buckets downsample of (x, y) to n_out points.
+    
+    The first and last points are kept; from each bucket in between the point
+    spanning the largest triangle with the previously kept point and the next
+    bucket's mean is picked. Returns slice(None) if there's nothing to drop.
+    """
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return slice(None)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    
+    # n_out - 2 buckets over the interior points [1, n - 1)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    counts = np.diff(edges)
+    mean_x = np.append(np.add.reduceat(x[:n - 1], edges[:-1]) / counts, x[-1])
+    mean_y = np.append(np.add.reduceat(y[:n - 1], edges[:-1]) / counts, y[-1])
     
-    return all_cols, filter_columns
+    idx = np.empty(n_out, dtype=np.intp)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        cx, cy = mean_x[i + 1], mean_y[i + 1]
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+def _load_run(history_path):
+    """Load one batch run's history and keep only the arrays the batch plots use.
+    
+    The full table is dropped on return. Returns None if the history has no
+    core mass column.
+    """
+    data, all_cols, filter_columns = _load_history(history_path, columns=_BATCH_COLUMNS)
+    
+    # Check for core mass data
+    all_cols_set = set(all_cols)
+    core_mass_attr_name = next((a for a in _CORE_MASS_ATTRS if a in all_cols_set), None)
+    if core_mass_attr_name is None:
+        return None
+    core_mass_data = getattr(data, core_mass_attr_name)
+    
+    color_index, magnitude, color_label, mag_label, system = setup_color_params(data, filter_columns)
+    
+    # Get age data
+    star_age = data.star_age if hasattr(data, 'star_age') else None
+    if star_age is not None:
+        age_data = np.multiply(star_age, 1e-6, dtype=np.float32)
+        age_label = "Age (Myr)"
+    else:
+        age_data = data.model_number
+        age_label = "Model Number"
+    
+    # Columns come back as views into the parsed table; the float32 copies
+    # let it be freed
+    return {
+        'star_age': _f32(star_age),
+        'age_data': _f32(age_data),
+        'age_label': age_label,
+        'star_mass': _f32(data.star_mass) if hasattr(data, 'star_mass') else None,
+        'core_mass_data': _f32(core_mass_data),
+        'core_mass_attr_name': core_mass_attr_name,
+        'color_index': _f32(color_index),
+        'magnitude': _f32(magnitude),
+        'color_label': color_label,
+        'mag_label': mag_label,
+        'system': system
+    }
 
 def setup_color_params(md, filter_columns):
     """Set up color parameters based on available filters."""
     
     # Priority 1: GAIA colors (Gbp - Grp)
     if "Gbp" in filter_columns and "Grp" in filter_columns and "G" in filter_columns:
-        color_index = md.Gbp - md.Grp
-        magnitude = md.G
+        magnitude = md.data("G")
+        color_index = md.data("Gbp") - md.data("Grp")
         color_label = "Gbp - Grp"
         mag_label = "G"
         system = "GAIA"
         
     # Priority 2: Johnson-Cousins (B-V)
     elif "B" in filter_columns and "V" in filter_columns:
-        color_index = md.B - md.V
-        magnitude = md.V
+        magnitude = md.data("V")
+        color_index = md.data("B") - magnitude
         color_label = "B - V"
         mag_label = "V"
         system = "Johnson"
         
     # Priority 3: 2MASS (J-K)
     elif "J" in filter_columns and "K" in filter_columns:
-        color_index = md.J - md.K
-        magnitude = md.K
+        magnitude = md.data("K")
+        color_index = md.data("J") - magnitude
         color_label = "J - K"
         mag_label = "K"
         system = "2MASS"
@@ -66,12 +206,9 @@ def setup_color_params(md, filter_columns):
     # Fallback: Use first two available filters
     elif len(filter_columns) >= 2:
         f1, f2 = filter_columns[0], filter_columns[1]
-        try:
-            col1 = getattr(md, f1)
-            col2 = getattr(md, f2)
-        except AttributeError:
-            col1 = md.data(f1)
-            col2 = md.data(f2)
+        # filter_columns come from the header, so both columns exist
+        col1 = md.data(f1)
+        col2 = md.data(f2)
             
         color_index = col1 - col2
         magnitude = col1
@@ -89,6 +226,16 @@ def setup_color_params(md, filter_columns):
     
     return color_index, magnitude, color_label, mag_label, system
 
+def _draw_age_curve(ax, x, y, color, age_label, ylabel, title, fontsize=12):
+    """Draw one single-run quantity against age; shared by the 2x2 grid and
+    the standalone figures (which use larger fonts).
+    """
+    ax.plot(x, y, '-', color=color, linewidth=2)
+    ax.set_xlabel(age_label, fontsize=fontsize)
+    ax.set_ylabel(ylabel, fontsize=fontsize)
+    ax.set_title(title, fontsize=fontsize + 2)
+    ax.grid(alpha=0.3)
+
 def plot_single_core_evolution(logs_path="LOGS"):
     """Create enhanced core mass evolution plots for a single MESA run"""
     
@@ -105,35 +252,27 @@ def plot_single_core_evolution(logs_path="LOGS"):
         
     try:
         # Load the data
-        data = mr.MesaData(history_path)
+        data, all_cols, filter_columns = _load_history(history_path)
         
         # Get filter information
-        all_cols, filter_columns = read_header_columns(history_path)
         color_index, magnitude, color_label, mag_label, system = setup_color_params(data, filter_columns)
         
         # Check if we have core mass information
-        has_core_mass = False
-        core_mass_data = None
-        core_mass_attr_name = None
-        
-        for core_mass_attr in ['he_core_mass', 'mass_conv_core', 'conv_mx1_top']:
-            if hasattr(data, core_mass_attr):
-                core_mass_attr_name = core_mass_attr
-                core_mass_data = getattr(data, core_mass_attr)
-                has_core_mass = True
-                break
+        all_cols_set = set(all_cols)
+        core_mass_attr_name = next((a for a in _CORE_MASS_ATTRS if a in all_cols_set), None)
                 
-        if not has_core_mass:
+        if core_mass_attr_name is None:
             print("Could not find core mass information in history data")
             return False
+        core_mass_data = getattr(data, core_mass_attr_name)
         
         # Create figure with subplots
-        fig, axes = plt.subplots(2, 2, figsize=(15, 12))
+        fig, axes = plt.subplots(2, 2, figsize=(15, 12), layout='constrained')
         fig.suptitle("Enhanced Core Evolution Analysis", fontsize=16)
         
         # Get age in Myr
         if hasattr(data, 'star_age'):
-            age = data.star_age / 1e6  # Convert to Myr
+            age = np.multiply(data.star_age, 1e-6, dtype=np.float32)  # Convert to Myr
             age_label = "Age (Myr)"
             age_data = age
         else:
@@ -142,38 +281,43 @@ def plot_single_core_evolution(logs_path="LOGS"):
             age_label = "Model Number"
         
         # Plot 1: Core Mass vs Age/Model
-        axes[0, 0].plot(age_data, core_mass_data, '-', color='blue', linewidth=2)
-        axes[0, 0].set_xlabel(age_label, fontsize=12)
-        axes[0, 0].set_ylabel(f"{core_mass_attr_name.replace('_', ' ').title()} ($M_\\odot$)", fontsize=12)
-        axes[0, 0].set_title("Core Mass Evolution", fontsize=14)
-        axes[0, 0].grid(alpha=0.3)
+        sel = _lttb(age_data, core_mass_data)
+        core_curve = (age_data[sel], core_mass_data[sel], 'blue', age_label,
+                      f"{core_mass_attr_name.replace('_', ' ').title()} ($M_\\odot$)",
+                      "Core Mass Evolution")
+        _draw_age_curve(axes[0, 0], *core_curve)
         
         # Plot 2: Core Mass Fraction vs Age/Model
         if hasattr(data, 'star_mass'):
-            core_mass_fraction = core_mass_data / data.star_mass
-            axes[0, 1].plot(age_data, core_mass_fraction, '-', color='red', linewidth=2)
-            axes[0, 1].set_xlabel(age_label, fontsize=12)
-            axes[0, 1].set_ylabel("Core Mass Fraction", fontsize=12)
-            axes[0, 1].set_title("Core Mass Fraction Evolution", fontsize=14)
-            axes[0, 1].grid(alpha=0.3)
+            core_mass_fraction = np.empty(len(core_mass_data), dtype=np.float32)
+            np.divide(core_mass_data, data.star_mass, out=core_mass_fraction, casting='unsafe')
+            sel = _lttb(age_data, core_mass_fraction)
+            fraction_curve = (age_data[sel], core_mass_fraction[sel], 'red', age_label,
+                              "Core Mass Fraction", "Core Mass Fraction Evolution")
+            _draw_age_curve(axes[0, 1], *fraction_curve)
         else:
             axes[0, 1].text(0.5, 0.5, "Star mass data\nnot available", 
                            ha='center', va='center', transform=axes[0, 1].transAxes)
             axes[0, 1].set_title("Core Mass Fraction (N/A)", fontsize=14)
         
+        # Long histories are rasterized in the scatter panels. Core mass isn't
+        # ordered in time, so these panels aren't LTTB-decimated
+        raster_scatter = len(core_mass_data) > _RASTER_SCATTER_POINTS
+        raster_line = len(core_mass_data) > _RASTER_LINE_POINTS
+        
         # Plot 3: Core Mass vs Color Index (if available)
         if color_index is not None:
             # Color by evolutionary phase if available
             if hasattr(data, 'center_h1'):
                 scatter = axes[1, 0].scatter(core_mass_data, color_index, 
                                            c=data.center_h1, cmap='viridis', 
-                                           s=30, alpha=0.7)
+                                           s=30, alpha=0.7, rasterized=raster_scatter)
                 plt.colorbar(scatter, ax=axes[1, 0], label='Central H fraction')
             else:
                 axes[1, 0].scatter(core_mass_data, color_index, color='green', 
-                                 s=30, alpha=0.7)
+                                 s=30, alpha=0.7, rasterized=raster_scatter)
                 axes[1, 0].plot(core_mass_data, color_index, '-', color='green', 
-                               alpha=0.5, linewidth=1)
+                               alpha=0.5, linewidth=1, rasterized=raster_line)
             
             axes[1, 0].set_xlabel(f"{core_mass_attr_name.replace('_', ' ').title()} ($M_\\odot$)", fontsize=12)
             axes[1, 0].set_ylabel(f"{color_label}", fontsize=12)
@@ -190,13 +334,13 @@ def plot_single_core_evolution(logs_path="LOGS"):
             if hasattr(data, 'center_h1'):
                 scatter = axes[1, 1].scatter(core_mass_data, magnitude, 
                                            c=data.center_h1, cmap='viridis', 
-                                           s=30, alpha=0.7)
+                                           s=30, alpha=0.7, rasterized=raster_scatter)
                 plt.colorbar(scatter, ax=axes[1, 1], label='Central H fraction')
             else:
                 axes[1, 1].scatter(core_mass_data, magnitude, color='purple', 
-                                 s=30, alpha=0.7)
+                                 s=30, alpha=0.7, rasterized=raster_scatter)
                 axes[1, 1].plot(core_mass_data, magnitude, '-', color='purple', 
-                               alpha=0.5, linewidth=1)
+                               alpha=0.5, linewidth=1, rasterized=raster_line)
             
             axes[1, 1].set_xlabel(f"{core_mass_attr_name.replace('_', ' ').title()} ($M_\\odot$)", fontsize=12)
             axes[1, 1].set_ylabel(f"{mag_label}", fontsize=12)
@@ -210,43 +354,100 @@ def plot_single_core_evolution(logs_path="LOGS"):
         
         # Save and show
         os.makedirs("plots", exist_ok=True)
-        plt.tight_layout()
-        plt.savefig("plots/core_evolution_enhanced.png", dpi=300, bbox_inches='tight')
-        print(f"Saved enhanced core evolution plot to plots/core_evolution_enhanced.png")
-        plt.show()
+        _output_figure(fig, "plots/core_evolution_enhanced.png",
+                       f"Saved enhanced core evolution plot to plots/core_evolution_enhanced.png",
+                       bbox_inches='tight')
         
         # Create separate traditional plots for compatibility
         # Core mass evolution
-        plt.figure(figsize=(10, 6))
-        plt.plot(age_data, core_mass_data, '-', color='blue', linewidth=2)
-        plt.xlabel(age_label, fontsize=14)
-        plt.ylabel(f"{core_mass_attr_name.replace('_', ' ').title()} ($M_\\odot$)", fontsize=14)
-        plt.title("Core Mass Evolution", fontsize=16)
-        plt.grid(alpha=0.3)
-        plt.tight_layout()
-        plt.savefig("plots/core_mass_evolution.png", dpi=300)
-        print(f"Saved core mass evolution to plots/core_mass_evolution.png")
-        plt.show()
+        fig = plt.figure(figsize=(10, 6), layout='constrained')
+        _draw_age_curve(plt.gca(), *core_curve, fontsize=14)
+        _output_figure(fig, "plots/core_mass_evolution.png",
+                       f"Saved core mass evolution to plots/core_mass_evolution.png")
         
         # Core mass fraction evolution (if available)
         if hasattr(data, 'star_mass'):
-            plt.figure(figsize=(10, 6))
-            plt.plot(age_data, core_mass_fraction, '-', color='red', linewidth=2)
-            plt.xlabel(age_label, fontsize=14)
-            plt.ylabel("Core Mass Fraction", fontsize=14)
-            plt.title("Core Mass Fraction Evolution", fontsize=16)
-            plt.grid(alpha=0.3)
-            plt.tight_layout()
-            plt.savefig("plots/core_mass_fraction.png", dpi=300)
-            print(f"Saved core mass fraction to plots/core_mass_fraction.png")
-            plt.show()
-            
+            fig = plt.figure(figsize=(10, 6), layout='constrained')
+            _draw_age_curve(plt.gca(), *fraction_curve, fontsize=14)
+            _output_figure(fig, "plots/core_mass_fraction.png",
+                           f"Saved core mass fraction to plots/core_mass_fraction.png")
+        
         return True
         
     except Exception as e:
         print(f"Error creating core evolution plots: {e}")
         return False
 
+def _draw_run_lines(ax, xs, ys, colors, linestyles, labels=None, decimate=True):
+    """Draw one curve per run (xs[i] against ys[i]) as a single LineCollection on ax.
+    
+    With decimate, long curves are LTTB-downsampled, which needs x ordered
+    (age); runs whose x or y is None are skipped.
+    If labels (one per run) are given, matching Line2D legend handles are returned.
+    """
+    picked = [i for i, (x, y) in enumerate(zip(xs, ys)) if x is not None and y is not None]
+    if not picked:
+        return []
+    
+    segments = []
+    for i in picked:
+        sel = _lttb(xs[i], ys[i]) if decimate else slice(None)
+        segments.append(np.column_stack([xs[i][sel], ys[i][sel]]))
+    lc = LineCollection(segments, colors=[colors[i] for i in picked],
+                        linestyles=[linestyles[i] for i in picked], linewidths=2, alpha=0.8)
+    ax.add_collection(lc)
+    ax.autoscale_view()
+    
+    if labels is None:
+        return []
+    return [Line2D([0], [0], color=colors[i], linestyle=linestyles[i], linewidth=2,
+                   alpha=0.8, label=labels[i]) for i in picked]
+
+def _process_run(run_dir_path):
+    """Parse a batch run's parameters and load it; None if it can't be used.
+    
+    Runs in a worker process, so the result holds only plain arrays and scalars.
+    """
+    run_dir = os.path.basename(run_dir_path)
+    history_path = os.path.join(run_dir_path, "LOGS", "history.data")
+    
+    if not os.path.exists(history_path):
+        print(f"Warning: No history file in {run_dir}")
+        return None
+        
+    try:
+        # Parse parameters from directory name
+        params = parse_run_name(run_dir)
+        if params is None:
+            raise ValueError(f"unrecognised run directory name '{run_dir}'")
+        mass, metallicity = params['mass'], params['metallicity']
+        scheme, fov = params['scheme'], params['fov']
+            
+        # Load data; only the plotted arrays are kept
+        run_info = _load_run(history_path)
+        
+        if run_info is None:
+            print(f"Warning: No core mass data in {run_dir}")
+            return None
+        
+        run_info.update({
+            'mass': mass,
+            'metallicity': metallicity,
+            'scheme': scheme,
+            'fov': fov,
+            'run_dir': run_dir
+        })
+        return run_info
+            
+    except Exception as e:
+        print(f"Error processing {run_dir}: {e}")
+        return None
+
+# Per-run scalars (kept in a DataFrame) and arrays (kept in parallel lists)
+_META_FIELDS = ('mass', 'metallicity', 'scheme', 'fov', 'run_dir', 'core_mass_attr_name',
+                'age_label', 'color_label', 'mag_label', 'system')
+_ARRAY_FIELDS = ('star_age', 'age_data', 'star_mass', 'core_mass_data', 'color_index', 'magnitude')
+
 def plot_batch_core_evolution():
     """Create core evolution plots for batch runs"""
     
@@ -256,137 +457,72 @@ def plot_batch_core_evolution():
         return False
         
     # Find all run directories
-    run_dirs = [d for d in os.listdir(runs_dir) 
-                if os.path.isdir(os.path.join(runs_dir, d)) and d.startswith("inlist_")]
+    run_dirs = [os.path.join(runs_dir, d) for d in find_run_dirs(runs_dir)]
     
     if not run_dirs:
         print("No batch run directories found")
         return False
         
-    # Parse run parameters and collect data
-    all_data = []
-    colors_mass = {}
-    linestyles_scheme = {}
-    
-    for run_dir in run_dirs:
-        history_path = os.path.join(runs_dir, run_dir, "LOGS", "history.data")
-        
-        if not os.path.exists(history_path):
-            print(f"Warning: No history file in {run_dir}")
-            continue
-            
-        try:
-            # Parse parameters from directory name
-            parts = run_dir.replace('inlist_M', '').split('_')
-            mass = float(parts[0])
-            metallicity = float(parts[1][1:])  # Remove 'Z'
-            
-            if 'noovs' in run_dir:
-                scheme = 'none'
-                fov = 0.0
-            else:
-                scheme = parts[2]
-                fov = float(parts[3][3:])  # Remove 'fov'
-                
-            # Load data
-            data = mr.MesaData(history_path)
-            
-            # Check for core mass data
-            core_mass_data = None
-            core_mass_attr_name = None
-            for core_mass_attr in ['he_core_mass', 'mass_conv_core', 'conv_mx1_top']:
-                if hasattr(data, core_mass_attr):
-                    core_mass_attr_name = core_mass_attr
-                    core_mass_data = getattr(data, core_mass_attr)
-                    break
-                    
-            if core_mass_data is None:
-                print(f"Warning: No core mass data in {run_dir}")
-                continue
-            
-            # Get filter information
-            all_cols, filter_columns = read_header_columns(history_path)
-            color_index, magnitude, color_label, mag_label, system = setup_color_params(data, filter_columns)
-            
-            # Store data
-            run_info = {
-                'data': data,
-                'mass': mass,
-                'metallicity': metallicity,
-                'scheme': scheme,
-                'fov': fov,
-                'core_mass_data': core_mass_data,
-                'core_mass_attr_name': core_mass_attr_name,
-                'color_index': color_index,
-                'magnitude': magnitude,
-                'color_label': color_label,
-                'mag_label': mag_label,
-                'system': system,
-                'run_dir': run_dir
-            }
-            all_data.append(run_info)
-            
-            # Assign colors by mass
-            if mass not in colors_mass:
-                colors_mass[mass] = plt.cm.viridis(len(colors_mass) / 10.0)
-                
-            # Assign line styles by scheme
-            if scheme not in linestyles_scheme:
-                styles = ['-', '--', '-.', ':']
-                linestyles_scheme[scheme] = styles[len(linestyles_scheme) % len(styles)]
-                
-        except Exception as e:
-            print(f"Error processing {run_dir}: {e}")
-            continue
+    # Parsing is CPU-bound and runs are independent, so load them in
+    # parallel (map keeps their order)
+    with ProcessPoolExecutor() as ex:
+        all_data = [r for r in ex.map(_process_run, run_dirs) if r is not None]
     
     if not all_data:
         print("No valid data found in batch runs")
         return False
-        
-    print(f"Creating batch core evolution plots for {len(all_data)} models")
+    
+    # Scalar metadata in one table, per-run arrays in parallel lists (row i is run i)
+    meta = pd.DataFrame({field: [r[field] for r in all_data] for field in _META_FIELDS})
+    arrays = {field: [r[field] for r in all_data] for field in _ARRAY_FIELDS}
+    del all_data
+    
+    # Colors by mass (evenly spread over viridis, one colormap call) and line
+    # styles by scheme, assigned in sorted order
+    masses = np.unique(meta['mass'])
+    colors_mass = dict(zip(masses, plt.cm.viridis(np.linspace(0.05, 0.95, len(masses)))))
+    schemes = sorted(meta['scheme'].unique())
+    linestyles_scheme = dict(zip(schemes, itertools.cycle(['-', '--', '-.', ':'])))
+    colors = [colors_mass[mass] for mass in meta['mass']]
+    linestyles = meta['scheme'].map(linestyles_scheme).tolist()
+        
+    print(f"Creating batch core evolution plots for {len(meta)} models")
     
     # Create batch core mass evolution plot
-    fig, axes = plt.subplots(2, 2, figsize=(15, 12))
+    fig, axes = plt.subplots(2, 2, figsize=(15, 12), layout='constrained')
     fig.suptitle("Batch Core Evolution Analysis", fontsize=16)
     
-    for run_info in all_data:
-        color = colors_mass[run_info['mass']]
-        linestyle = linestyles_scheme[run_info['scheme']]
-        
-        label = f"M={run_info['mass']}M☉"
-        if run_info['scheme'] != 'none':
-            label += f", {run_info['scheme']}"
-            if run_info['fov'] > 0:
-                label += f" (f_ov={run_info['fov']})"
+    labels = []
+    for run in meta.itertuples():
+        label = f"M={run.mass}M☉"
+        if run.scheme != 'none':
+            label += f", {run.scheme}"
+            if run.fov > 0:
+                label += f" (f_ov={run.fov})"
         else:
             label += ", no ovs"
-        
-        # Get age data
-        if hasattr(run_info['data'], 'star_age'):
-            age_data = run_info['data'].star_age / 1e6
-            age_label = "Age (Myr)"
-        else:
-            age_data = run_info['data'].model_number
-            age_label = "Model Number"
-        
-        # Plot 1: Core mass vs age
-        axes[0, 0].plot(age_data, run_info['core_mass_data'], 
-                       color=color, linestyle=linestyle, linewidth=2, 
-                       label=label, alpha=0.8)
-        
-        # Plot 2: Core mass fraction vs age (if available)
-        if hasattr(run_info['data'], 'star_mass'):
-            core_mass_fraction = run_info['core_mass_data'] / run_info['data'].star_mass
-            axes[0, 1].plot(age_data, core_mass_fraction, 
-                           color=color, linestyle=linestyle, linewidth=2, 
-                           alpha=0.8)
+        labels.append(label)
+    
+    # Get age data
+    age_label = meta['age_label'].iloc[-1]
+    ages = arrays['age_data']
+    core_masses = arrays['core_mass_data']
+    
+    # Plot 1: Core mass vs age
+    handles = _draw_run_lines(axes[0, 0], ages, core_masses, colors, linestyles, labels)
+    
+    # Plot 2: Core mass fraction vs age (if available)
+    _draw_run_lines(axes[0, 1], ages,
+                    [core / star if star is not None else None
+                     for core, star in zip(core_masses, arrays['star_mass'])],
+                    colors, linestyles)
     
     # Format plots
     axes[0, 0].set_xlabel(age_label, fontsize=12)
     axes[0, 0].set_ylabel("Core Mass ($M_\\odot$)", fontsize=12)
     axes[0, 0].set_title("Core Mass Evolution", fontsize=14)
     axes[0, 0].grid(alpha=0.3)
-    axes[0, 0].legend(bbox_to_anchor=(1.05, 1), loc='upper left', fontsize=8)
+    axes[0, 0].legend(handles=handles, bbox_to_anchor=(1.05, 1), loc='upper left', fontsize=8)
     
     axes[0, 1].set_xlabel(age_label, fontsize=12)
     axes[0, 1].set_ylabel("Core Mass Fraction", fontsize=12)
@@ -394,34 +530,32 @@ def plot_batch_core_evolution():
     axes[0, 1].grid(alpha=0.3)
     
     # Plot 3 & 4: Color-core mass relationships for models with photometry
-    models_with_colors = [r for r in all_data if r['color_index'] is not None]
+    has_colors = meta['system'].notna()
     
-    if models_with_colors:
+    if has_colors.any():
         # Determine primary photometric system
-        systems = [r['system'] for r in models_with_colors]
-        primary_system = max(set(systems), key=systems.count)
-        primary_models = [r for r in models_with_colors if r['system'] == primary_system]
+        primary_system = meta.loc[has_colors, 'system'].value_counts().idxmax()
+        primary = (meta['system'] == primary_system).to_numpy()
         
-        for run_info in primary_models:
-            color = colors_mass[run_info['mass']]
-            linestyle = linestyles_scheme[run_info['scheme']]
-            
-            # Plot 3: Core mass vs color index
-            axes[1, 0].plot(run_info['core_mass_data'], run_info['color_index'], 
-                           color=color, linestyle=linestyle, linewidth=2, alpha=0.8)
-            
-            # Plot 4: Core mass vs magnitude
-            if run_info['magnitude'] is not None:
-                axes[1, 1].plot(run_info['core_mass_data'], run_info['magnitude'], 
-                               color=color, linestyle=linestyle, linewidth=2, alpha=0.8)
+        def rows(values):
+            return [v for v, keep in zip(values, primary) if keep]
+        
+        # Plot 3: Core mass vs color index
+        _draw_run_lines(axes[1, 0], rows(core_masses), rows(arrays['color_index']),
+                        rows(colors), rows(linestyles), decimate=False)
+        
+        # Plot 4: Core mass vs magnitude
+        _draw_run_lines(axes[1, 1], rows(core_masses), rows(arrays['magnitude']),
+                        rows(colors), rows(linestyles), decimate=False)
         
+        first = meta[primary].iloc[0]
         axes[1, 0].set_xlabel("Core Mass ($M_\\odot$)", fontsize=12)
-        axes[1, 0].set_ylabel(f"{primary_models[0]['color_label']}", fontsize=12)
+        axes[1, 0].set_ylabel(f"{first['color_label']}", fontsize=12)
         axes[1, 0].set_title(f"Core Mass vs {primary_system} Color", fontsize=14)
         axes[1, 0].grid(alpha=0.3)
         
         axes[1, 1].set_xlabel("Core Mass ($M_\\odot$)", fontsize=12)
-        axes[1, 1].set_ylabel(f"{primary_models[0]['mag_label']}", fontsize=12)
+        axes[1, 1].set_ylabel(f"{first['mag_label']}", fontsize=12)
         axes[1, 1].invert_yaxis()
         axes[1, 1].set_title(f"Core Mass vs {primary_system} Magnitude", fontsize=14)
         axes[1, 1].grid(alpha=0.3)
@@ -432,37 +566,45 @@ def plot_batch_core_evolution():
                        ha='center', va='center', transform=axes[1, 1].transAxes)
     
     os.makedirs("plots", exist_ok=True)
-    plt.tight_layout()
-    plt.savefig("plots/core_evolution_batch.png", dpi=300, bbox_inches='tight')
-    print(f"Saved batch core evolution to plots/core_evolution_batch.png")
-    plt.show()
+    _output_figure(fig, "plots/core_evolution_batch.png",
+                   f"Saved batch core evolution to plots/core_evolution_batch.png",
+                   bbox_inches='tight')
     
     # Create separate traditional plots
-    plt.figure(figsize=(12, 8))
-    for run_info in all_data:
-        color = colors_mass[run_info['mass']]
-        linestyle = linestyles_scheme[run_info['scheme']]
-        
-        label = f"M={run_info['mass']}M☉, {run_info['scheme']}"
-        if run_info['fov'] > 0:
-            label += f" (f_ov={run_info['fov']})"
-        
-        # Use log age for better visualization
-        if hasattr(run_info['data'], 'star_age'):
-            log_age = np.log10(run_info['data'].star_age / 1e6)  # log(age in Myr)
-            plt.plot(log_age, run_info['core_mass_data'], 
-                    color=color, linestyle=linestyle, linewidth=2, 
-                    label=label, alpha=0.8)
+    fig = plt.figure(figsize=(12, 8), layout='constrained')
+    labels = []
+    for run in meta.itertuples():
+        label = f"M={run.mass}M☉, {run.scheme}"
+        if run.fov > 0:
+            label += f" (f_ov={run.fov})"
+        labels.append(label)
+    
+    # Use log age for better visualization
+    # log(age in Myr) = log10(age) - 6, written into slices of one float32
+    # buffer; non-positive ages are left as NaN gaps instead of -inf
+    ages = arrays['star_age']
+    buf = np.full(sum(len(age) for age in ages if age is not None), np.nan, dtype=np.float32)
+    log_ages = []
+    pos = 0
+    for age in ages:
+        if age is None:
+            log_ages.append(None)
+            continue
+        out = buf[pos:pos + len(age)]
+        pos += len(age)
+        np.log10(age, out=out, where=age > 0)
+        out -= 6.0
+        log_ages.append(out)
+    handles = _draw_run_lines(plt.gca(), log_ages, core_masses, colors, linestyles, labels)
     
     plt.xlabel("log Age (Myr)", fontsize=14)
     plt.ylabel("Core Mass ($M_\\odot$)", fontsize=14)
     plt.title("Core Mass vs Log Age (All Models)", fontsize=16)
     plt.grid(alpha=0.3)
-    plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
-    plt.tight_layout()
-    plt.savefig("plots/core_mass_vs_log_age.png", dpi=300, bbox_inches='tight')
-    print(f"Saved core mass vs log age to plots/core_mass_vs_log_age.png")
-    plt.show()
+    plt.legend(handles=handles, bbox_to_anchor=(1.05, 1), loc='upper left')
+    _output_figure(fig, "plots/core_mass_vs_log_age.png",
+                   f"Saved core mass vs log age to plots/core_mass_vs_log_age.png",
+                   bbox_inches='tight')
     
     return True
 
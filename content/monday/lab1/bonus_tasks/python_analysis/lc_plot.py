@@ -5,101 +5,305 @@ Compare custom colors evolution across different stellar masses and overshooting
 """
 
 import os
+import itertools
+import functools
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
+import pandas as pd
+from mesa_figures import HEADLESS, PNG_KWARGS
+
 import matplotlib.pyplot as plt
-import mesa_reader as mr
 import matplotlib.gridspec as gridspec
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
 import glob
+from mesa_runs import find_run_dirs, parse_run_name
+from mesa_cache import HistoryData, read_mesa_table
 
-def read_header_columns(history_file):
-    """Read column headers from history file to find available filters."""
-    header_line = None
-    with open(history_file, "r") as fp:
-        for line in fp:
-            if "model_number" in line:
-                header_line = line.strip()
-                break
-    
-    if header_line is None:
-        return [], []
-    
-    all_cols = header_line.split()
-    
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+# Curves longer than this are min/max decimated before plotting
+_MAX_PLOT_POINTS = 4000
+
+# Screen quality by default; LC_PLOT_HIRES=1 saves print-quality PNGs
+_DPI = 300 if os.environ.get("LC_PLOT_HIRES") == "1" else 150
+
+
+def _filter_columns(all_cols):
+    """The filter columns are the ones after Flux_bol."""
     try:
         flux_index = all_cols.index("Flux_bol")
-        filter_columns = all_cols[flux_index + 1:]
+        return all_cols[flux_index + 1:]
     except ValueError:
-        filter_columns = []
-    
-    return all_cols, filter_columns
+        return []
+
+# Photometric systems in priority order:
+# (name, required filters, candidate filters, primary color, primary mag, candidate colors)
+_PHOT_SYSTEMS = [
+    ('GAIA', {'Gbp', 'G', 'Grp'}, ['Gbp', 'G', 'Grp'], 'Gbp-Grp', 'G',
+     ['Gbp-Grp', 'Gbp-G', 'G-Grp']),
+    ('Johnson', {'B', 'V'}, ['U', 'B', 'V', 'R', 'I'], 'B-V', 'V',
+     ['B-V', 'V-R', 'U-B']),
+    ('2MASS', {'J', 'K'}, ['J', 'H', 'K'], 'J-K', 'K',
+     ['J-K', 'H-K']),
+    ('SDSS', {'g', 'r'}, ['u', 'g', 'r', 'i', 'z'], 'g-r', 'r',
+     ['g-r', 'r-i'])
+]
 
 def setup_photometric_system(md, filter_columns):
     """Choose the best available photometric system."""
+    system = _setup_phot_system_cached(frozenset(filter_columns))
+    if system is None:
+        return None
+    # Fresh dict and lists so callers can't alter the cached result
+    return {key: list(value) if isinstance(value, list) else value 
+            for key, value in system.items()}
+
+@functools.lru_cache(maxsize=32)
+def _setup_phot_system_cached(fset):
+    """setup_photometric_system for a frozenset of filters, memoized."""
+    for name, required, candidates, primary_color, primary_mag, candidate_colors in _PHOT_SYSTEMS:
+        if required.issubset(fset):
+            return {
+                'name': name,
+                'filters': [f for f in candidates if f in fset],
+                'primary_color': primary_color,
+                'primary_mag': primary_mag,
+                'colors': [c for c in candidate_colors if fset.issuperset(c.split('-'))]
+            }
     
-    # Priority 1: GAIA
-    if all(f in filter_columns for f in ['Gbp', 'G', 'Grp']):
-        return {
-            'name': 'GAIA',
-            'filters': ['Gbp', 'G', 'Grp'],
-            'primary_color': 'Gbp-Grp',
-            'primary_mag': 'G',
-            'colors': ['Gbp-Grp', 'Gbp-G', 'G-Grp']
-        }
+    return None
+
+# Internal-structure columns the physics-photometry panels plot, when present
+_PHYSICS_COLUMNS = ('log_center_T', 'log_center_Rho', 'log_Teff', 'log_L')
+
+# Non-filter columns _load_run reads
+_RUN_COLUMNS = ('star_age', 'star_mass', 'he_core_mass', 'mass_conv_core',
+                'conv_mx1_top') + _PHYSICS_COLUMNS
+
+# Shared HDF5 cache of every run's history columns, kept in the runs directory
+_CACHE_NAME = ".lc_plot_cache.h5"
+_CACHE_CHUNK = 4096
+
+def _read_history_columns(history_path):
+    """Parse a history file and keep only the columns _load_run uses.
     
-    # Priority 2: Johnson-Cousins
-    elif all(f in filter_columns for f in ['B', 'V']):
-        available = [f for f in ['U', 'B', 'V', 'R', 'I'] if f in filter_columns]
-        colors = []
-        if 'B' in available and 'V' in available:
-            colors.append('B-V')
-        if 'V' in available and 'R' in available:
-            colors.append('V-R')
-        if 'U' in available and 'B' in available:
-            colors.append('U-B')
-        
-        return {
-            'name': 'Johnson',
-            'filters': available,
-            'primary_color': 'B-V',
-            'primary_mag': 'V',
-            'colors': colors
-        }
+    Returns (all_cols, columns), columns being a dict of arrays by name.
+    """
+    def select(all_cols):
+        keep = set(_RUN_COLUMNS).union(_filter_columns(all_cols))
+        return [name for name in all_cols if name in keep]
     
-    # Priority 3: 2MASS
-    elif all(f in filter_columns for f in ['J', 'K']):
-        available = [f for f in ['J', 'H', 'K'] if f in filter_columns]
-        colors = []
-        if 'J' in available and 'K' in available:
-            colors.append('J-K')
-        if 'H' in available and 'K' in available:
-            colors.append('H-K')
-        
-        return {
-            'name': '2MASS',
-            'filters': available,
-            'primary_color': 'J-K',
-            'primary_mag': 'K',
-            'colors': colors
-        }
+    _, all_cols, df = read_mesa_table(history_path, select)
+    return all_cols, {name: df[name].to_numpy() for name in df.columns}
+
+def _refresh_history_cache(runs_dir, run_dirs):
+    """Bring the runs' shared HDF5 history cache up to date and return its path.
+    
+    The cache holds one group per run directory with the columns _load_run
+    reads (chunked, lzf-compressed datasets), the full column list and the
+    history.data mtime it was made from; a history that fails to parse gets an
+    empty group with its error, so it isn't retried until the file changes.
+    Only runs whose history.data changed
+    are parsed again, on a process pool. Any change rebuilds the cache in a
+    temporary file that then replaces the old one, so an interrupted write
+    never leaves a broken cache; groups of runs that are gone are dropped,
+    and an unreadable cache is rebuilt. Returns None without h5py or if the
+    cache can't be written.
+    """
+    if h5py is None:
+        return None
+    
+    cache_path = os.path.join(runs_dir, _CACHE_NAME)
+    history_paths = {d: os.path.join(runs_dir, d, "LOGS", "history.data") for d in run_dirs}
+    mtimes = {d: os.path.getmtime(path) for d, path in history_paths.items() if os.path.exists(path)}
+    
+    fresh = []
+    cached = []
+    if os.path.exists(cache_path):
+        try:
+            with h5py.File(cache_path, "r") as f:
+                cached = list(f)
+                fresh = [d for d in mtimes
+                         if d in f and f[d].attrs.get("source_mtime") == mtimes[d]]
+        except OSError as e:
+            print(f"Warning: Rebuilding unreadable HDF5 cache {cache_path}: {e}")
+    stale = [d for d in mtimes if d not in fresh]
+    if not stale and sorted(cached) == sorted(mtimes):
+        return cache_path
+    
+    if stale:
+        print(f"Caching {len(stale)} history files in {cache_path}")
+    tmp_path = cache_path + ".tmp"
+    try:
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+            futures = {d: ex.submit(_read_history_columns, history_paths[d]) for d in stale}
+            with h5py.File(tmp_path, "w", libver="latest") as f:
+                if fresh:
+                    with h5py.File(cache_path, "r") as old:
+                        for run_dir in fresh:
+                            old.copy(old[run_dir], f, name=run_dir)
+                for run_dir, future in futures.items():
+                    group = f.create_group(run_dir)
+                    group.attrs["source_mtime"] = mtimes[run_dir]
+                    try:
+                        all_cols, columns = future.result()
+                    except Exception as e:
+                        # Kept as an empty group; _load_run reports the error
+                        group.attrs["error"] = str(e)
+                        continue
+                    for name, values in columns.items():
+                        group.create_dataset(name, data=values, compression="lzf",
+                                             chunks=(max(1, min(len(values), _CACHE_CHUNK)),))
+                    group.attrs["bulk_names"] = all_cols
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Warning: Could not update HDF5 cache, reading text files: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+    return cache_path
+
+def _f32(a):
+    """Owned float32 copy of a plotted column (plenty of precision for plots)."""
+    return np.array(a, dtype=np.float32)
+
+def _downsample(x, y, max_points=_MAX_PLOT_POINTS):
+    """Min/max decimation of the curve (x, y) to at most about max_points points.
+    
+    The points are split into max_points // 2 equal bins and each bin keeps its
+    lowest and highest y (in time order), so spikes survive. The first and last
+    points are always kept. Short curves are returned unchanged.
+    """
+    n = len(x)
+    if n <= max_points or max_points < 4:
+        return x, y
+    
+    n_bins = max_points // 2
+    size = -(-n // n_bins)
+    # Pad the last bin with the final value so the bins reshape evenly
+    binned = np.pad(y, (0, size * n_bins - n), mode='edge').reshape(n_bins, size)
+    picks = np.sort(np.stack([binned.argmin(axis=1), binned.argmax(axis=1)], axis=1), axis=1)
+    idx = (picks + np.arange(0, n_bins * size, size)[:, None]).ravel()
+    idx = np.unique(np.concatenate([[0], np.minimum(idx, n - 1), [n - 1]]))
+    return x[idx], y[idx]
+
+def _load_run(run_dir, runs_dir, cache_path=None):
+    """Parse a batch run's parameters and load its history; None if it can't be used.
     
-    # Priority 4: SDSS
-    elif all(f in filter_columns for f in ['g', 'r']):
-        available = [f for f in ['u', 'g', 'r', 'i', 'z'] if f in filter_columns]
-        colors = []
-        if 'g' in available and 'r' in available:
-            colors.append('g-r')
-        if 'r' in available and 'i' in available:
-            colors.append('r-i')
+    The history columns come from the shared HDF5 cache at cache_path when it
+    has them, otherwise from the text file.
+    """
+    history_path = os.path.join(runs_dir, run_dir, "LOGS", "history.data")
+    
+    if not os.path.exists(history_path):
+        print(f"Warning: No history file in {run_dir}")
+        return None
+    
+    try:
+        # Parse parameters from directory name
+        params = parse_run_name(run_dir)
+        if params is None:
+            raise ValueError(f"unrecognised run directory name '{run_dir}'")
+        mass, metallicity = params['mass'], params['metallicity']
+        scheme, fov = params['scheme'], params['fov']
+        
+        # Load data and get filter information
+        loaded = None
+        if cache_path is not None:
+            try:
+                with h5py.File(cache_path, "r") as f:
+                    if run_dir in f:
+                        group = f[run_dir]
+                        if "error" in group.attrs:
+                            raise ValueError(f"could not parse {history_path}: {group.attrs['error']}")
+                        loaded = list(group.attrs["bulk_names"]), {name: group[name][()] for name in group}
+            except (OSError, KeyError) as e:
+                print(f"Warning: Could not read {run_dir} from HDF5 cache, reading text file: {e}")
+        all_cols, columns = loaded or _read_history_columns(history_path)
+        md = HistoryData(pd.DataFrame(columns))
+        filter_columns = _filter_columns(all_cols)
+        
+        if not filter_columns:
+            print(f"No photometric filters in {run_dir}, skipping...")
+            return None
+        
+        # Set up photometric system
+        phot_system = setup_photometric_system(md, filter_columns)
+        
+        if phot_system is None:
+            print(f"No compatible photometric system in {run_dir}, skipping...")
+            return None
         
+        # Pull out the filter magnitudes, age in Myr, colors and color change
+        # rates once for all three plot functions
+        filter_arrays = {f: md.data(f) for f in phot_system['filters']}
+        age_myr = md.star_age / 1e6
+        color_arrays = {}
+        color_rates = {}
+        dt = np.diff(age_myr)
+        for color_name in phot_system['colors']:
+            f1, f2 = color_name.split('-')
+            color_arrays[color_name] = filter_arrays[f1] - filter_arrays[f2]
+            if len(age_myr) > 1:
+                color_rates[color_name] = np.diff(color_arrays[color_name]) / dt
+        
+        # Physics columns looked up in the header once, so plotting needs no
+        # attribute probing; the core mass falls back through what MESA wrote
+        avail = set(all_cols)
+        physics = {name: md.data(name) for name in _PHYSICS_COLUMNS if name in avail}
+        if 'he_core_mass' in avail:
+            physics['core_mass'] = md.he_core_mass
+        elif 'mass_conv_core' in avail:
+            physics['core_mass'] = md.mass_conv_core
+        elif 'conv_mx1_top' in avail:
+            physics['core_mass'] = md.conv_mx1_top * (md.star_mass if 'star_mass' in avail else 1.0)
+        
+        # The rest is only plotted, so keep float32 copies; colors and rates
+        # were differenced in float64 first. age_myr stays float64 for callers
+        filter_arrays = {f: _f32(a) for f, a in filter_arrays.items()}
+        color_arrays = {c: _f32(a) for c, a in color_arrays.items()}
+        color_rates = {c: _f32(a) for c, a in color_rates.items()}
+        physics = {name: _f32(a) for name, a in physics.items()}
+        plot_age = _f32(age_myr)
+        
+        # Decimated copies of the age curves, keyed by (name, max_points). The
+        # changes from the initial magnitude and the color rates are stored
+        # under their axis label, e.g. "ΔG" and "d(Gbp-Grp)/dt"
+        downsampled = {}
+        for name, values in itertools.chain(filter_arrays.items(), color_arrays.items()):
+            downsampled[(name, _MAX_PLOT_POINTS)] = _downsample(plot_age, values)
+        for f in filter_arrays:
+            # Decimation keeps the first point and is unaffected by an offset,
+            # so the decimated change is the decimated magnitude minus mag[0]
+            ages, mags = downsampled[(f, _MAX_PLOT_POINTS)]
+            downsampled[(f"Δ{f}", _MAX_PLOT_POINTS)] = (ages, mags - mags[0])
+        for color_name, rate in color_rates.items():
+            downsampled[(f"d({color_name})/dt", _MAX_PLOT_POINTS)] = _downsample(plot_age[1:], rate)
+        
+        # Store data
         return {
-            'name': 'SDSS',
-            'filters': available,
-            'primary_color': 'g-r',
-            'primary_mag': 'r',
-            'colors': colors
+            'physics': physics,
+            'filter_arrays': filter_arrays,
+            'age_myr': age_myr,
+            'color_arrays': color_arrays,
+            'color_rates': color_rates,
+            'downsampled': downsampled,
+            'mass': mass,
+            'metallicity': metallicity,
+            'scheme': scheme,
+            'fov': fov,
+            'phot_system': phot_system,
+            'filter_columns': filter_columns,
+            'run_dir': run_dir
         }
-    
-    return None
+            
+    except Exception as e:
+        print(f"Error processing {run_dir}: {e}")
+        return None
 
 def plot_batch_lightcurves(runs_dir="../runs"):
     """Create comparative lightcurve plots for batch MESA runs."""
@@ -109,8 +313,7 @@ def plot_batch_lightcurves(runs_dir="../runs"):
         return
     
     # Find all run directories
-    run_dirs = [d for d in os.listdir(runs_dir) 
-                if d.startswith('inlist_M') and os.path.isdir(os.path.join(runs_dir, d))]
+    run_dirs = find_run_dirs(runs_dir)
     
     if not run_dirs:
         print("No batch run directories found")
@@ -118,81 +321,28 @@ def plot_batch_lightcurves(runs_dir="../runs"):
     
     print(f"Found {len(run_dirs)} model runs")
     
-    # Parse run parameters and collect data
-    all_data = []
-    mass_colors = {}
-    scheme_linestyles = {}
-    
-    for run_dir in run_dirs:
-        history_path = os.path.join(runs_dir, run_dir, "LOGS", "history.data")
-        
-        if not os.path.exists(history_path):
-            print(f"Warning: No history file in {run_dir}")
-            continue
-        
-        try:
-            # Parse parameters from directory name
-            parts = run_dir.replace('inlist_M', '').split('_')
-            mass = float(parts[0])
-            metallicity = float(parts[1][1:]) if len(parts) > 1 else 0.014
-            
-            if 'noovs' in run_dir:
-                scheme = 'none'
-                fov = 0.0
-            else:
-                scheme = parts[2] if len(parts) > 2 else 'unknown'
-                fov = float(parts[3][3:]) if len(parts) > 3 else 0.0
-            
-            # Load data
-            md = mr.MesaData(history_path)
-            
-            # Get filter information
-            all_cols, filter_columns = read_header_columns(history_path)
-            
-            if not filter_columns:
-                print(f"No photometric filters in {run_dir}, skipping...")
-                continue
-            
-            # Set up photometric system
-            phot_system = setup_photometric_system(md, filter_columns)
-            
-            if phot_system is None:
-                print(f"No compatible photometric system in {run_dir}, skipping...")
-                continue
-            
-            # Store data
-            run_info = {
-                'data': md,
-                'mass': mass,
-                'metallicity': metallicity,
-                'scheme': scheme,
-                'fov': fov,
-                'phot_system': phot_system,
-                'filter_columns': filter_columns,
-                'run_dir': run_dir
-            }
-            all_data.append(run_info)
-            
-            # Assign colors by mass
-            if mass not in mass_colors:
-                mass_colors[mass] = plt.cm.viridis(len(mass_colors) / 10.0)
-            
-            # Assign line styles by scheme
-            if scheme not in scheme_linestyles:
-                styles = ['-', '--', '-.', ':']
-                scheme_linestyles[scheme] = styles[len(scheme_linestyles) % len(styles)]
-                
-        except Exception as e:
-            print(f"Error processing {run_dir}: {e}")
-            continue
+    # Parse only new or changed histories into the shared cache, then load
+    # the runs from it on a process pool (map keeps their order)
+    cache_path = _refresh_history_cache(runs_dir, run_dirs)
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+        all_data = [run for run in ex.map(_load_run, run_dirs, itertools.repeat(runs_dir),
+                                          itertools.repeat(cache_path))
+                    if run is not None]
     
     if not all_data:
         print("No valid data found!")
         return
     
+    # Colors by mass (evenly spread over viridis, one colormap call) and line
+    # styles by scheme, assigned in sorted order
+    masses = sorted({run_info['mass'] for run_info in all_data})
+    mass_colors = dict(zip(masses, plt.cm.viridis(np.linspace(0.05, 0.95, len(masses)))))
+    schemes = sorted({run_info['scheme'] for run_info in all_data})
+    scheme_linestyles = dict(zip(schemes, itertools.cycle(['-', '--', '-.', ':'])))
+    
     print(f"Successfully loaded {len(all_data)} models")
-    print(f"Available masses: {sorted(mass_colors.keys())}")
-    print(f"Available schemes: {list(scheme_linestyles.keys())}")
+    print(f"Available masses: {masses}")
+    print(f"Available schemes: {schemes}")
     
     # Determine common photometric system
     systems = [run['phot_system']['name'] for run in all_data]
@@ -203,40 +353,89 @@ def plot_batch_lightcurves(runs_dir="../runs"):
     filtered_data = [run for run in all_data if run['phot_system']['name'] == most_common_system]
     print(f"Using {most_common_system} photometric system for {len(filtered_data)} models")
     
-    # Create comprehensive comparison plots
-    create_magnitude_comparison(filtered_data, mass_colors, scheme_linestyles, most_common_system)
-    create_color_evolution_comparison(filtered_data, mass_colors, scheme_linestyles, most_common_system)
-    create_physics_photometry_correlation(filtered_data, mass_colors, scheme_linestyles, most_common_system)
+    # One row per run, with its line color, style and legend label worked out
+    # up front so the plot functions just read columns
+    runs = pd.DataFrame(filtered_data)
+    runs['color'] = runs['mass'].map(mass_colors)
+    runs['linestyle'] = runs['scheme'].map(scheme_linestyles)
+    runs['label'] = [f"M={mass:.1f}, {scheme}" for mass, scheme in zip(runs['mass'], runs['scheme'])]
+    
+    # Create comprehensive comparison plots, all drawn on one reused figure
+    fig = create_magnitude_comparison(runs, most_common_system)
+    fig = create_color_evolution_comparison(runs, most_common_system, fig=fig)
+    fig = create_physics_photometry_correlation(runs, most_common_system, fig=fig)
+    plt.close(fig)
+
+def _reuse_figure(fig, width, height):
+    """Clear fig and resize it to width x height inches, or start a new figure.
+    
+    A figure closed by plt.show() can't be drawn on again, so a fresh one is
+    made if fig is None or no longer open.
+    """
+    if fig is None or not plt.fignum_exists(fig.number):
+        fig = plt.figure(layout='constrained')
+    fig.clear()
+    fig.set_size_inches(width, height)
+    return fig
+
+def _add_run_legend(fig, runs):
+    """One figure legend keyed by mass (line color) and scheme (line style).
+    
+    Entries come from the distinct masses and schemes, not one per run.
+    """
+    masses = runs.drop_duplicates('mass').sort_values('mass')
+    schemes = runs.drop_duplicates('scheme').sort_values('scheme')
+    handles = [Line2D([0], [0], color=color, linewidth=2, label=f"M={mass:.1f}")
+               for mass, color in zip(masses['mass'], masses['color'])]
+    handles += [Line2D([0], [0], color='k', linestyle=linestyle, linewidth=2, label=scheme)
+                for scheme, linestyle in zip(schemes['scheme'], schemes['linestyle'])]
+    fig.legend(handles=handles, loc='outside right upper')
+
+def _draw_run_lines(ax, xs, ys, colors, linestyles, labels=None):
+    """Draw one curve per run (xs[i] against ys[i]) as a single LineCollection on ax.
+    
+    Runs whose y is None are skipped. If labels (one per run) are given,
+    matching Line2D legend handles are returned.
+    """
+    picked = [i for i, y in enumerate(ys) if y is not None]
+    if not picked:
+        return []
+    
+    segments = [np.column_stack([xs[i], ys[i]]) for i in picked]
+    lc = LineCollection(segments, colors=[colors[i] for i in picked],
+                        linestyles=[linestyles[i] for i in picked], linewidths=2, alpha=0.8)
+    ax.add_collection(lc)
+    ax.autoscale_view()
+    
+    if labels is None:
+        return []
+    return [Line2D([0], [0], color=colors[i], linestyle=linestyles[i], linewidth=2,
+                   alpha=0.8, label=labels[i]) for i in picked]
 
-def create_magnitude_comparison(all_data, mass_colors, scheme_linestyles, system_name):
-    """Create magnitude lightcurve comparisons."""
+def create_magnitude_comparison(runs, system_name, fig=None):
+    """Create magnitude lightcurve comparisons.
     
-    phot_system = all_data[0]['phot_system']
+    Draws on fig (cleared first) if it's given and still open. Returns the
+    figure so the next plot can reuse it.
+    """
+    
+    phot_system = runs['phot_system'].iloc[0]
     n_filters = len(phot_system['filters'])
     
-    fig, axes = plt.subplots(2, n_filters, figsize=(5*n_filters, 10))
+    fig = _reuse_figure(fig, 5*n_filters, 10)
+    axes = fig.subplots(2, n_filters)
     if n_filters == 1:
         axes = axes.reshape(2, 1)
     
+    colors = runs['color'].tolist()
+    linestyles = runs['linestyle'].tolist()
+    
     for i, filter_name in enumerate(phot_system['filters']):
+        ages, mags = zip(*(curves[(filter_name, _MAX_PLOT_POINTS)] for curves in runs['downsampled']))
+        
         # Top panel: Absolute magnitudes
         ax1 = axes[0, i]
-        
-        for run in all_data:
-            md = run['data']
-            age_myr = md.star_age / 1e6
-            
-            try:
-                mag_data = getattr(md, filter_name)
-            except AttributeError:
-                mag_data = md.data(filter_name)
-            
-            color = mass_colors[run['mass']]
-            linestyle = scheme_linestyles[run['scheme']]
-            
-            label = f"M={run['mass']:.1f}, {run['scheme']}"
-            ax1.plot(age_myr, mag_data, color=color, linestyle=linestyle, 
-                    linewidth=2, label=label, alpha=0.8)
+        _draw_run_lines(ax1, ages, mags, colors, linestyles)
         
         ax1.set_xlabel("Age (Myr)")
         ax1.set_ylabel(f"{filter_name} magnitude")
@@ -244,29 +443,11 @@ def create_magnitude_comparison(all_data, mass_colors, scheme_linestyles, system
         ax1.invert_yaxis()
         ax1.grid(alpha=0.3)
         
-        if i == 0:  # Only show legend on first plot
-            ax1.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
-        
         # Bottom panel: Magnitude differences from initial
         ax2 = axes[1, i]
-        
-        for run in all_data:
-            md = run['data']
-            age_myr = md.star_age / 1e6
-            
-            try:
-                mag_data = getattr(md, filter_name)
-            except AttributeError:
-                mag_data = md.data(filter_name)
-            
-            # Calculate change from initial magnitude
-            mag_change = mag_data - mag_data[0]
-            
-            color = mass_colors[run['mass']]
-            linestyle = scheme_linestyles[run['scheme']]
-            
-            ax2.plot(age_myr, mag_change, color=color, linestyle=linestyle, 
-                    linewidth=2, alpha=0.8)
+        ages, mag_changes = zip(*(curves[(f"Δ{filter_name}", _MAX_PLOT_POINTS)]
+                                  for curves in runs['downsampled']))
+        _draw_run_lines(ax2, ages, mag_changes, colors, linestyles)
         
         ax2.set_xlabel("Age (Myr)")
         ax2.set_ylabel(f"Δ{filter_name} (mag)")
@@ -274,91 +455,55 @@ def create_magnitude_comparison(all_data, mass_colors, scheme_linestyles, system
         ax2.grid(alpha=0.3)
         ax2.axhline(y=0, color='black', linestyle='-', alpha=0.5)
     
-    plt.suptitle(f"{system_name} Photometric Evolution Comparison", fontsize=16)
-    plt.tight_layout()
-    
+    _add_run_legend(fig, runs)
+    fig.suptitle(f"{system_name} Photometric Evolution Comparison", fontsize=16)
     os.makedirs("plots", exist_ok=True)
-    plt.savefig(f"plots/batch_lightcurves_{system_name.lower()}.png", 
-                dpi=300, bbox_inches='tight')
+    fig.savefig(f"plots/batch_lightcurves_{system_name.lower()}.png", 
+                dpi=_DPI, pil_kwargs=PNG_KWARGS)
     print(f"Saved: plots/batch_lightcurves_{system_name.lower()}.png")
-    plt.show()
+    if not HEADLESS:
+        plt.show()
+    return fig
 
-def create_color_evolution_comparison(all_data, mass_colors, scheme_linestyles, system_name):
-    """Create color evolution comparisons."""
+def create_color_evolution_comparison(runs, system_name, fig=None):
+    """Create color evolution comparisons.
+    
+    Draws on fig (cleared first) if it's given and still open. Returns the
+    figure so the next plot can reuse it.
+    """
     
-    phot_system = all_data[0]['phot_system']
+    phot_system = runs['phot_system'].iloc[0]
     colors = phot_system['colors']
     
     if not colors:
         print("No colors available for comparison")
-        return
+        return fig
     
     n_colors = len(colors)
-    fig, axes = plt.subplots(2, n_colors, figsize=(6*n_colors, 10))
+    fig = _reuse_figure(fig, 6*n_colors, 10)
+    axes = fig.subplots(2, n_colors)
     if n_colors == 1:
         axes = axes.reshape(2, 1)
     
+    line_colors = runs['color'].tolist()
+    linestyles = runs['linestyle'].tolist()
+    
     for i, color_name in enumerate(colors):
-        f1, f2 = color_name.split('-')
-        
         # Top panel: Color evolution
         ax1 = axes[0, i]
-        
-        for run in all_data:
-            md = run['data']
-            age_myr = md.star_age / 1e6
-            
-            try:
-                mag1 = getattr(md, f1)
-                mag2 = getattr(md, f2)
-            except AttributeError:
-                mag1 = md.data(f1)
-                mag2 = md.data(f2)
-            
-            color_data = mag1 - mag2
-            
-            color = mass_colors[run['mass']]
-            linestyle = scheme_linestyles[run['scheme']]
-            
-            label = f"M={run['mass']:.1f}, {run['scheme']}"
-            ax1.plot(age_myr, color_data, color=color, linestyle=linestyle, 
-                    linewidth=2, label=label, alpha=0.8)
+        ages, values = zip(*(curves[(color_name, _MAX_PLOT_POINTS)] for curves in runs['downsampled']))
+        _draw_run_lines(ax1, ages, values, line_colors, linestyles)
         
         ax1.set_xlabel("Age (Myr)")
         ax1.set_ylabel(f"{color_name}")
         ax1.set_title(f"{color_name} Color Evolution")
         ax1.grid(alpha=0.3)
         
-        if i == 0:
-            ax1.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
-        
-        # Bottom panel: Color change rate
+        # Bottom panel: Color change rate (runs too short for a rate are skipped)
         ax2 = axes[1, i]
-        
-        for run in all_data:
-            md = run['data']
-            age_myr = md.star_age / 1e6
-            
-            try:
-                mag1 = getattr(md, f1)
-                mag2 = getattr(md, f2)
-            except AttributeError:
-                mag1 = md.data(f1)
-                mag2 = md.data(f2)
-            
-            color_data = mag1 - mag2
-            
-            # Calculate color change rate
-            if len(age_myr) > 1:
-                dt = np.diff(age_myr)
-                dc = np.diff(color_data)
-                color_rate = dc / dt
-                
-                color = mass_colors[run['mass']]
-                linestyle = scheme_linestyles[run['scheme']]
-                
-                ax2.plot(age_myr[1:], color_rate, color=color, linestyle=linestyle, 
-                        linewidth=2, alpha=0.8)
+        rate_ages, rates = zip(*(curves.get((f"d({color_name})/dt", _MAX_PLOT_POINTS), (None, None))
+                                 for curves in runs['downsampled']))
+        _draw_run_lines(ax2, rate_ages, rates, line_colors, linestyles)
         
         ax2.set_xlabel("Age (Myr)")
         ax2.set_ylabel(f"d({color_name})/dt (mag/Myr)")
@@ -366,67 +511,53 @@ def create_color_evolution_comparison(all_data, mass_colors, scheme_linestyles,
         ax2.grid(alpha=0.3)
         ax2.axhline(y=0, color='black', linestyle='-', alpha=0.5)
     
-    plt.suptitle(f"{system_name} Color Evolution Comparison", fontsize=16)
-    plt.tight_layout()
-    
-    plt.savefig(f"plots/batch_color_evolution_{system_name.lower()}.png", 
-                dpi=300, bbox_inches='tight')
+    _add_run_legend(fig, runs)
+    fig.suptitle(f"{system_name} Color Evolution Comparison", fontsize=16)
+    fig.savefig(f"plots/batch_color_evolution_{system_name.lower()}.png", 
+                dpi=_DPI, pil_kwargs=PNG_KWARGS)
     print(f"Saved: plots/batch_color_evolution_{system_name.lower()}.png")
-    plt.show()
+    if not HEADLESS:
+        plt.show()
+    return fig
 
-def create_physics_photometry_correlation(all_data, mass_colors, scheme_linestyles, system_name):
-    """Create plots showing correlations between internal physics and photometric properties."""
+def create_physics_photometry_correlation(runs, system_name, fig=None):
+    """Create plots showing correlations between internal physics and photometric properties.
     
-    phot_system = all_data[0]['phot_system']
+    Draws on fig (cleared first) if it's given and still open. Returns the
+    figure so the next plot can reuse it.
+    """
+    
+    phot_system = runs['phot_system'].iloc[0]
     primary_color = phot_system['primary_color']
     primary_mag = phot_system['primary_mag']
     
-    f1, f2 = primary_color.split('-')
+    fig = _reuse_figure(fig, 16, 12)
+    (ax1, ax2), (ax3, ax4) = fig.subplots(2, 2)
+    
+    physics = runs['physics'].tolist()
+    primary_colors = [color_arrays[primary_color] for color_arrays in runs['color_arrays']]
+    primary_mags = [filter_arrays[primary_mag] for filter_arrays in runs['filter_arrays']]
+    colors = runs['color'].tolist()
+    linestyles = runs['linestyle'].tolist()
     
-    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
+    def against(name, values):
+        # Each run's name column and its values, with None for runs lacking the column
+        xs = [p.get(name) for p in physics]
+        return xs, [v if x is not None else None for x, v in zip(xs, values)]
     
     # Plot 1: Color vs Central Temperature
-    for run in all_data:
-        md = run['data']
-        
-        if hasattr(md, 'log_center_T'):
-            try:
-                mag1 = getattr(md, f1)
-                mag2 = getattr(md, f2)
-            except AttributeError:
-                mag1 = md.data(f1)
-                mag2 = md.data(f2)
-            
-            color_data = mag1 - mag2
-            
-            color = mass_colors[run['mass']]
-            linestyle = scheme_linestyles[run['scheme']]
-            
-            label = f"M={run['mass']:.1f}, {run['scheme']}"
-            ax1.plot(md.log_center_T, color_data, color=color, linestyle=linestyle, 
-                    linewidth=2, label=label, alpha=0.8)
+    handles = _draw_run_lines(ax1, *against('log_center_T', primary_colors), colors, linestyles,
+                              runs['label'].tolist())
     
     ax1.set_xlabel("log Central Temperature")
     ax1.set_ylabel(f"{primary_color}")
     ax1.set_title("Color vs Central Temperature")
     ax1.grid(alpha=0.3)
-    ax1.legend()
+    if handles:
+        ax1.legend(handles=handles)
     
     # Plot 2: Magnitude vs Central Density
-    for run in all_data:
-        md = run['data']
-        
-        if hasattr(md, 'log_center_Rho'):
-            try:
-                mag_data = getattr(md, primary_mag)
-            except AttributeError:
-                mag_data = md.data(primary_mag)
-            
-            color = mass_colors[run['mass']]
-            linestyle = scheme_linestyles[run['scheme']]
-            
-            ax2.plot(md.log_center_Rho, mag_data, color=color, linestyle=linestyle, 
-                    linewidth=2, alpha=0.8)
+    _draw_run_lines(ax2, *against('log_center_Rho', primary_mags), colors, linestyles)
     
     ax2.set_xlabel("log Central Density")
     ax2.set_ylabel(f"{primary_mag} magnitude")
@@ -435,56 +566,24 @@ def create_physics_photometry_correlation(all_data, mass_colors, scheme_linestyl
     ax2.grid(alpha=0.3)
     
     # Plot 3: Color vs Convective Core Mass (if available)
-    for run in all_data:
-        md = run['data']
-        
-        # Look for core mass data
-        core_mass = None
-        if hasattr(md, 'he_core_mass'):
-            core_mass = md.he_core_mass
-        elif hasattr(md, 'mass_conv_core'):
-            core_mass = md.mass_conv_core
-        elif hasattr(md, 'conv_mx1_top'):
-            core_mass = md.conv_mx1_top * getattr(md, 'star_mass', 1.0)
-        
-        if core_mass is not None:
-            try:
-                mag1 = getattr(md, f1)
-                mag2 = getattr(md, f2)
-            except AttributeError:
-                mag1 = md.data(f1)
-                mag2 = md.data(f2)
-            
-            color_data = mag1 - mag2
-            
-            color = mass_colors[run['mass']]
-            linestyle = scheme_linestyles[run['scheme']]
-            
-            ax3.plot(core_mass, color_data, color=color, linestyle=linestyle, 
-                    linewidth=2, alpha=0.8)
+    _draw_run_lines(ax3, *against('core_mass', primary_colors), colors, linestyles)
     
     ax3.set_xlabel("Convective Core Mass (M☉)")
     ax3.set_ylabel(f"{primary_color}")
     ax3.set_title("Color vs Convective Core Mass")
     ax3.grid(alpha=0.3)
     
-    # Plot 4: Luminosity vs Surface Temperature (HR-like but with photometry)
-    for run in all_data:
-        md = run['data']
+    # Plot 4: Luminosity vs Surface Temperature (HR-like but with photometry).
+    # All runs go into one scatter, colored by photometric color on a shared scale
+    hr = [(p['log_Teff'], p['log_L'], c) for p, c in zip(physics, primary_colors)
+          if 'log_Teff' in p and 'log_L' in p]
+    if hr:
+        teff, lum, color_data = (np.concatenate(parts) for parts in zip(*hr))
+        scatter = ax4.scatter(teff, lum, c=color_data, cmap='viridis', s=20, alpha=0.7)
         
-        if hasattr(md, 'log_Teff') and hasattr(md, 'log_L'):
-            # Color by photometric color
-            try:
-                mag1 = getattr(md, f1)
-                mag2 = getattr(md, f2)
-            except AttributeError:
-                mag1 = md.data(f1)
-                mag2 = md2.data(f2)
-            
-            color_data = mag1 - mag2
-            
-            scatter = ax4.scatter(md.log_Teff, md.log_L, c=color_data, 
-                                cmap='viridis', s=20, alpha=0.7)
+        # Add colorbar
+        cbar = fig.colorbar(scatter, ax=ax4)
+        cbar.set_label(f"{primary_color}")
     
     ax4.set_xlabel("log Teff")
     ax4.set_ylabel("log L/L☉")
@@ -492,17 +591,13 @@ def create_physics_photometry_correlation(all_data, mass_colors, scheme_linestyl
     ax4.invert_xaxis()
     ax4.grid(alpha=0.3)
     
-    # Add colorbar
-    cbar = plt.colorbar(scatter, ax=ax4)
-    cbar.set_label(f"{primary_color}")
-    
-    plt.suptitle(f"{system_name} Physics-Photometry Correlations", fontsize=16)
-    plt.tight_layout()
-    
-    plt.savefig(f"plots/batch_physics_photometry_{system_name.lower()}.png", 
-                dpi=300, bbox_inches='tight')
+    fig.suptitle(f"{system_name} Physics-Photometry Correlations", fontsize=16)
+    fig.savefig(f"plots/batch_physics_photometry_{system_name.lower()}.png", 
+                dpi=_DPI, pil_kwargs=PNG_KWARGS)
     print(f"Saved: plots/batch_physics_photometry_{system_name.lower()}.png")
-    plt.show()
+    if not HEADLESS:
+        plt.show()
+    return fig
 
 if __name__ == "__main__":
     print("MESA Batch Custom Colors Lightcurve Analysis")
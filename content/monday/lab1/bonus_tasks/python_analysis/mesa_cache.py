@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+mesa_cache.py - MESA text file parsing and HDF5 caches shared by the analysis scripts
+History and profile files get one HDF5 copy each, whichever script writes it first
+"""
+
+import os
+import ast
+import threading
+import numpy as np
+import pandas as pd
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+def _header_value(token):
+    """A header value as a Python number/string, like mr.MesaData's."""
+    try:
+        return ast.literal_eval(token)
+    except (ValueError, SyntaxError):
+        return token
+
+class HistoryData:
+    """Attribute-style access to a history table, standing in for mr.MesaData."""
+    
+    def __init__(self, df, header=None):
+        self._df = df
+        self.bulk_names = tuple(df.columns)
+        self.header_data = dict(header or {})
+        self.header_names = list(self.header_data)
+    
+    @property
+    def bulk_data(self):
+        """The table as a numpy structured array, like MesaData.bulk_data."""
+        return self._df.to_records(index=False)
+    
+    def __getattr__(self, name):
+        # Go through __dict__ so lookups during unpickling don't recurse
+        df = self.__dict__.get('_df')
+        if df is None or name not in df.columns:
+            raise AttributeError(name)
+        return self.data(name)
+    
+    def data(self, name):
+        return self._df[name].to_numpy()
+
+def read_mesa_table(path, select=None):
+    """Parse a MESA history or profile file with pandas' C parser instead of mr.MesaData.
+    
+    The column header is taken from the same open file handle, so the file is
+    opened once. Column dtypes are fixed up front from the first data row
+    (integers stay integers, everything else is float64), which spares the
+    type inference. select, if given, is called with the column names and
+    returns the ones to parse. Returns (header, all_cols, df).
+    """
+    with open(path, "r") as fp:
+        # Lines 2-3 hold the header names/values; line 6 holds the column names
+        fp.readline()
+        header = dict(zip(fp.readline().split(), map(_header_value, fp.readline().split())))
+        fp.readline()
+        fp.readline()
+        all_cols = fp.readline().split()
+        data_start = fp.tell()
+        first_row = fp.readline().split()
+        
+        usecols = None if select is None else select(all_cols)
+        
+        dtype_map = None
+        if len(first_row) == len(all_cols):
+            keep = set(all_cols if usecols is None else usecols)
+            dtype_map = {name: np.int64 if token.lstrip('-').isdigit() else np.float64
+                         for name, token in zip(all_cols, first_row)
+                         if name in keep}
+        
+        try:
+            fp.seek(data_start)
+            df = pd.read_csv(fp, sep=r"\s+", header=None, names=all_cols, usecols=usecols,
+                             dtype=dtype_map, engine="c", na_values=["NaN"])
+        except (ValueError, OverflowError):
+            # A column that looked integral in row one isn't; let pandas infer
+            fp.seek(data_start)
+            df = pd.read_csv(fp, sep=r"\s+", header=None, names=all_cols, usecols=usecols,
+                             engine="c", na_values=["NaN"])
+    
+    return header, all_cols, df
+
+def h5_cache(text_path):
+    """Path of an HDF5 copy of a MESA text file, (re)written when older than it.
+    
+    Every column becomes its own chunked dataset, so later loads read only
+    the columns they use; header values are kept as "header:<name>"
+    attributes. Needs h5py.
+    """
+    h5_path = text_path + ".h5"
+    if os.path.exists(h5_path) and os.path.getmtime(h5_path) >= os.path.getmtime(text_path):
+        return h5_path
+    
+    header, all_cols, df = read_mesa_table(text_path)
+    # Named per process and thread, so scripts (or loader threads) writing at
+    # the same time don't clobber each other's temporary file
+    tmp_path = f"{h5_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with h5py.File(tmp_path, "w") as f:
+            for name in all_cols:
+                f.create_dataset(name, data=df[name].to_numpy(), chunks=True, compression="lzf")
+            f.attrs["bulk_names"] = list(all_cols)
+            for name, value in header.items():
+                f.attrs["header:" + name] = value
+        os.replace(tmp_path, h5_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return h5_path
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+mesa_figures.py - Matplotlib backend choice and PNG save settings shared by the analysis scripts
+Import it before matplotlib.pyplot, so the Agg backend is picked when there is no display
+"""
+
+import os
+import sys
+import matplotlib
+
+# Without a display (batch jobs, ssh sessions) there is nothing to show on;
+# MPL_BATCH=1 forces the same non-interactive mode
+if os.environ.get("MPL_BATCH") == "1" or (
+        sys.platform.startswith("linux") and "MPLBACKEND" not in os.environ
+        and not os.environ.get("DISPLAY") and not os.environ.get("WAYLAND_DISPLAY")):
+    matplotlib.use("Agg")
+
+# Non-interactive backends can't show windows, so plt.show() is skipped
+HEADLESS = matplotlib.get_backend().lower() in ("agg", "pdf", "ps", "svg", "cairo", "pgf", "template")
+
+# Pass as savefig(pil_kwargs=...): zlib level 1 is a much faster deflate
+# for slightly larger files, and PNG encoding dominates savefig
+PNG_KWARGS = {'compress_level': 1}
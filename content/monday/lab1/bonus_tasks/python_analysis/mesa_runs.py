@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+mesa_runs.py - Batch run directory helpers shared by the analysis scripts
+Finds the inlist_M* run directories under runs/ and reads their parameters from the name
+"""
+
+import os
+import re
+
+# Batch run directories: inlist_M<mass>_Z<z>_noovs or inlist_M<mass>_Z<z>_<scheme>_fov<fov>...
+# Everything after the mass is optional; missing parts get parse_run_name's defaults
+RUN_RE = re.compile(r"^inlist_M(?P<mass>[\d.]+)(?:_Z(?P<z>[\d.]+))?"
+                    r"(?:_(?:(?P<noovs>noovs)|(?P<scheme>[A-Za-z]+)(?:_fov(?P<fov>[\d.]+))?))?")
+
+def parse_run_name(run_dir):
+    """Parameters of a batch run from its directory name, or None if it can't be read.
+    
+    Returns a dict with mass, metallicity, scheme and fov. A missing Z means
+    0.014, a missing scheme 'unknown' and a missing f_ov 0.0; noovs runs have
+    scheme 'none'.
+    """
+    m = RUN_RE.match(run_dir)
+    if m is None:
+        return None
+    
+    if m['noovs']:
+        scheme = 'none'
+        fov = 0.0
+    else:
+        scheme = m['scheme'] or 'unknown'
+        fov = float(m['fov']) if m['fov'] else 0.0
+    
+    return {
+        'mass': float(m['mass']),
+        'metallicity': float(m['z']) if m['z'] else 0.014,
+        'scheme': scheme,
+        'fov': fov,
+    }
+
+def find_run_dirs(runs_dir):
+    """Names of the batch run directories in runs_dir, in directory order.
+    
+    inlist_M* directories whose name can't be parsed are skipped with a warning.
+    """
+    run_dirs = []
+    # scandir entries cache the is_dir() result
+    for entry in os.scandir(runs_dir):
+        if not entry.name.startswith('inlist_M') or not entry.is_dir():
+            continue
+        if RUN_RE.match(entry.name):
+            run_dirs.append(entry.name)
+        else:
+            print(f"Warning: Can't parse run parameters from {entry.name}, skipping")
+    return run_dirs
@@ -5,19 +5,67 @@ Replaces hr_plot.py to emphasize GAIA and custom photometric colors
 """
 
 import os
+import functools
+import hashlib
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
+import pandas as pd
+from mesa_figures import HEADLESS, PNG_KWARGS
+
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.collections import LineCollection
 from mpl_toolkits.mplot3d import Axes3D
-import mesa_reader as mr
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
 import glob
+from mesa_runs import find_run_dirs, parse_run_name
+from mesa_cache import HistoryData, read_mesa_table
+
+# Flush long paths to the Agg renderer in chunks rather than all at once
+plt.rcParams['agg.path.chunksize'] = 10000
+
+# Output resolution for saved PNGs; override with the CMD_DPI environment variable
+_DPI = int(os.environ.get("CMD_DPI", 150))
+
+def _new_figure(figsize):
+    """Return the shared plotting figure, cleared and resized to figsize."""
+    fig = plt.figure(num="plot_cmd", clear=True)
+    fig.set_size_inches(figsize)
+    return fig
+
+def _show_figure(fig):
+    """Show the figure interactively, or just clear it for reuse when headless."""
+    if HEADLESS:
+        fig.clear()
+    else:
+        plt.show()
+
+# Parsed headers keyed on (path, mtime) so a history file is only scanned once
+_HEADER_CACHE = {}
 
 def read_header_columns(history_file):
     """Read column headers from history file to find available filters."""
+    key = (history_file, os.stat(history_file).st_mtime)
+    if key in _HEADER_CACHE:
+        return _HEADER_CACHE[key]
+    
+    # Only read as much of the file as needed to reach the column name line
     header_line = None
-    with open(history_file, "r") as fp:
-        for line in fp:
-            if "model_number" in line:
-                header_line = line.strip()
+    buf = b""
+    with open(history_file, "rb") as fp:
+        while True:
+            chunk = fp.read(8192)
+            buf += chunk
+            pos = buf.find(b"model_number")
+            # Stop once the whole line holding 'model_number' is in the buffer
+            if pos != -1 and (b"\n" in buf[pos:] or not chunk):
+                start = buf.rfind(b"\n", 0, pos) + 1
+                end = buf.find(b"\n", pos)
+                header_line = buf[start:end if end != -1 else None].decode().strip()
+                break
+            if not chunk:
                 break
     
     if header_line is None:
@@ -35,75 +83,274 @@ def read_header_columns(history_file):
         print("Warning: Could not find 'Flux_bol' column in header")
         filter_columns = []
     
+    _HEADER_CACHE[key] = (all_cols, filter_columns)
     return all_cols, filter_columns
 
-def setup_cmd_params(md, filter_columns):
-    """Set up parameters for CMD based on available filters."""
+# History columns used by the CMD plots besides the photometric filters
+_CORE_COLUMNS = ("star_age", "center_h1", "log_Teff", "log_L")
+
+# On-disk cache of parsed history files, one .npz of plain column arrays per
+# file (and column set), replaced when the file changes
+_CACHE_DIR = os.path.expanduser("~/.cache/mesa_cmd")
+
+def load_mesa(history_path, columns=None):
+    """Load a MESA history file, reusing a cached copy if the file is unchanged.
+    
+    The file is parsed with mesa_cache.read_mesa_table, reading only columns
+    (those present) if given, and returned as a mesa_cache.HistoryData.
+    Whether center_h1 is monotonic is worked out once here, cached with the
+    columns and set as data.h1_decreasing, so ZAMS/TAMS lookups don't rescan it.
+    """
+    st = os.stat(history_path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    key = f"{os.path.abspath(history_path)}:{columns}"
+    cache_file = os.path.join(_CACHE_DIR, hashlib.sha1(key.encode()).hexdigest() + ".npz")
+    
+    # The entry records the mtime and size it was made from, so a rerun of
+    # MESA overwrites it rather than adding another file
+    try:
+        with np.load(cache_file) as npz:
+            # Entries written before the monotonicity flag was cached are rebuilt
+            if tuple(npz["_stamp"]) == stamp and "_h1_decreasing" in npz.files:
+                data = HistoryData(pd.DataFrame({c: npz[c] for c in npz.files
+                                                 if not c.startswith("_")}))
+                data.h1_decreasing = bool(npz["_h1_decreasing"])
+                return data
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile) as e:
+        print(f"Warning: Discarding unreadable cache for {history_path}: {e}")
+        try:
+            os.remove(cache_file)
+        except OSError:
+            pass
+    
+    def select(all_cols):
+        wanted = set(columns)
+        return [c for c in all_cols if c in wanted]
+    
+    header, _, df = read_mesa_table(history_path, None if columns is None else select)
+    data = HistoryData(df, header)
+    
+    h1 = data.center_h1 if "center_h1" in data.bulk_names else None
+    data.h1_decreasing = h1 is not None and bool(np.all(h1[1:] <= h1[:-1]))
+    
+    try:
+        os.makedirs(_CACHE_DIR, exist_ok=True)
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "wb") as fp:
+            np.savez(fp, _stamp=np.array(stamp, dtype=np.int64),
+                     _h1_decreasing=np.array(data.h1_decreasing),
+                     **{c: data.data(c) for c in data.bulk_names})
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"Warning: Could not write cache for {history_path}: {e}")
+    
+    return data
+
+@functools.lru_cache(maxsize=None)
+def pick_filters(filter_columns):
+    """Choose the CMD columns for a tuple of available filters.
+    
+    Returns ((blue, red), mag_column, color_label, mag_label, system). red is
+    None when the x-axis is a single column rather than a difference.
+    Cached, so each distinct filter set only goes through the cascade once.
+    """
     
     # Priority 1: GAIA colors (Gbp - Grp vs G)
     if "Gbp" in filter_columns and "Grp" in filter_columns and "G" in filter_columns:
-        color_index = md.Gbp - md.Grp
-        magnitude = md.G
-        color_label = "Gbp - Grp"
-        mag_label = "G"
-        system = "GAIA"
         print("Using GAIA CMD: Gbp-Grp vs G")
+        return ("Gbp", "Grp"), "G", "Gbp - Grp", "G", "GAIA"
         
     # Priority 2: Johnson-Cousins (B-V vs V)
     elif "B" in filter_columns and "V" in filter_columns:
-        color_index = md.B - md.V
-        magnitude = md.V
-        color_label = "B - V"
-        mag_label = "V"
-        system = "Johnson"
         print("Using Johnson CMD: B-V vs V")
+        return ("B", "V"), "V", "B - V", "V", "Johnson"
         
     # Priority 3: 2MASS (J-K vs K)
     elif "J" in filter_columns and "K" in filter_columns:
-        color_index = md.J - md.K
-        magnitude = md.K
-        color_label = "J - K"
-        mag_label = "K"
-        system = "2MASS"
         print("Using 2MASS CMD: J-K vs K")
+        return ("J", "K"), "K", "J - K", "K", "2MASS"
         
     # Priority 4: SDSS (g-r vs r)
     elif "g" in filter_columns and "r" in filter_columns:
-        color_index = getattr(md, 'g') - getattr(md, 'r')
-        magnitude = getattr(md, 'r')
-        color_label = "g - r"
-        mag_label = "r"
-        system = "SDSS"
         print("Using SDSS CMD: g-r vs r")
+        return ("g", "r"), "r", "g - r", "r", "SDSS"
         
     # Fallback: Use first two available filters
     elif len(filter_columns) >= 2:
         f1, f2 = filter_columns[0], filter_columns[1]
-        try:
-            col1 = getattr(md, f1)
-            col2 = getattr(md, f2)
-        except AttributeError:
-            col1 = md.data(f1)
-            col2 = md.data(f2)
-            
-        color_index = col1 - col2
-        magnitude = col1
         color_label = f"{f1} - {f2}"
-        mag_label = f1
-        system = "Custom"
-        print(f"Using custom CMD: {color_label} vs {mag_label}")
+        print(f"Using custom CMD: {color_label} vs {f1}")
+        return (f1, f2), f1, color_label, f1, "Custom"
         
     else:
         # No filters available - fall back to traditional HR diagram
         print("Warning: No photometric filters found, falling back to HR diagram")
-        color_index = md.log_Teff
-        magnitude = md.log_L
-        color_label = "log Teff"
-        mag_label = "log L/L☉"
-        system = "HR"
+        return ("log_Teff", None), "log_L", "log Teff", "log L/L☉", "HR"
+
+def apply_filters(md, color_pair, mag_column):
+    """Compute the color index and magnitude arrays for a pick_filters choice."""
     
+    def column(name):
+        try:
+            return getattr(md, name)
+        except AttributeError:
+            return md.data(name)
+    
+    blue, red = color_pair
+    color_index = np.asarray(column(blue))
+    if red is not None:
+        # Write the difference straight into one buffer, no extra temporaries
+        diff = np.empty_like(color_index)
+        np.subtract(color_index, column(red), out=diff)
+        color_index = diff
+    
+    # asarray returns the stored column itself rather than a copy
+    return color_index, np.asarray(column(mag_column))
+
+def setup_cmd_params(md, filter_columns):
+    """Set up parameters for CMD based on available filters."""
+    color_pair, mag_column, color_label, mag_label, system = pick_filters(tuple(filter_columns))
+    color_index, magnitude = apply_filters(md, color_pair, mag_column)
     return color_index, magnitude, color_label, mag_label, system
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True)
+    def _nearest_idx(arr, target):
+        """Single-pass nearest-value search with no temporary arrays."""
+        best = 0
+        best_dist = abs(arr[0] - target)
+        for i in range(1, arr.size):
+            dist = abs(arr[i] - target)
+            if dist < best_dist:
+                best_dist = dist
+                best = i
+        return best
+else:
+    def _nearest_idx(arr, target):
+        """Nearest-value search (numba not installed, so use NumPy)."""
+        return np.abs(arr - target).argmin()
+
+def _nearest_h1_index(h1, target, decreasing):
+    """Index of the model whose central H1 is closest to target."""
+    if not decreasing:
+        return _nearest_idx(h1, target)
+    
+    # center_h1 falls monotonically, so a binary search on -h1 is enough
+    idx = min(np.searchsorted(-h1, -target), len(h1) - 1)
+    if idx > 0 and abs(h1[idx - 1] - target) <= abs(h1[idx] - target):
+        idx -= 1
+    return idx
+
+def _decimate(x, y, n=2000):
+    """Thin a track to about n points evenly spaced in arc length.
+    
+    Returns the thinned x, y and the indices kept, so other columns can be
+    subset the same way.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if len(x) <= n:
+        return x, y, np.arange(len(x))
+    
+    # Measure path length in axis-normalised units so both axes count equally
+    dx = np.diff(x) / (np.ptp(x) or 1.0)
+    dy = np.diff(y) / (np.ptp(y) or 1.0)
+    s = np.concatenate(([0], np.cumsum(np.hypot(dx, dy))))
+    if not np.isfinite(s[-1]) or s[-1] == 0:
+        return x, y, np.arange(len(x))
+    
+    idx = np.unique(np.searchsorted(s, np.linspace(0, s[-1], n)))
+    idx[-1] = len(x) - 1
+    return x[idx], y[idx], idx
+
+def _track_segments(*cols):
+    """Turn per-model columns into (N-1, 2, ndim) line segments for a LineCollection."""
+    pts = np.column_stack(cols).reshape(-1, 1, len(cols))
+    return np.concatenate([pts[:-1], pts[1:]], axis=1)
+
+def _draw_cmd_3d(fig, ci, mag, age, h1, hmax, markers, color_label, mag_label, system):
+    """Draw the 3D CMD track on fig from plain arrays.
+    
+    Stays off pyplot so rotation workers can redraw it on a bare Figure.
+    h1 (central H1 of each kept model) colors the track when given;
+    markers is a list of (x, y, z, scatter kwargs).
+    """
+    ax = fig.add_subplot(111, projection='3d')
+    
+    if h1 is not None:
+        points = Line3DCollection(_track_segments(ci, mag, age),
+                                  cmap=plt.cm.viridis, norm=plt.Normalize(0, hmax),
+                                  linewidth=2, alpha=0.8, rasterized=True)
+        points.set_array(h1[:-1])
+        ax.add_collection3d(points)
+        
+        # Collections don't autoscale 3D axes, so set the limits here
+        ax.set_xlim(np.nanmin(ci), np.nanmax(ci))
+        ax.set_ylim(np.nanmin(mag), np.nanmax(mag))
+        ax.set_zlim(np.nanmin(age), np.nanmax(age))
+        
+        # Add colorbar
+        cbar = fig.colorbar(points, ax=ax, pad=0.1)
+        cbar.set_label('Central H mass fraction')
+    else:
+        ax.plot(ci, mag, age, color='blue', linewidth=2, rasterized=True)
+    
+    for x, y, z, kwargs in markers:
+        ax.scatter(x, y, z, **kwargs)
+    
+    ax.set_xlabel(f"{color_label}", fontsize=14)
+    ax.set_ylabel(f"{mag_label}", fontsize=14)
+    ax.set_zlabel("Age (Myr)", fontsize=14)
+    ax.invert_yaxis()
+    
+    # For HR diagram, also invert x-axis
+    if system == "HR":
+        ax.invert_xaxis()
+        
+    ax.legend()
+    ax.set_title(f"3D {system} CMD Evolution", fontsize=16)
+    return ax
+
+# Figure each worker process redraws once and renders rotation frames from
+_ROTATION_FIG = None
+
+def _init_rotation_worker(figsize, plot_args):
+    """Rebuild the 3D figure from its arrays on a bare Agg figure."""
+    global _ROTATION_FIG
+    _ROTATION_FIG = Figure(figsize=figsize)
+    FigureCanvasAgg(_ROTATION_FIG)
+    _draw_cmd_3d(_ROTATION_FIG, **plot_args)
+
+def _render_rotation_frame(azim):
+    """Render the 3D figure at one azimuth and return it as a palette image."""
+    from PIL import Image
+    
+    _ROTATION_FIG.axes[0].view_init(elev=20, azim=azim)
+    canvas = _ROTATION_FIG.canvas
+    canvas.draw()
+    # Quantize here so the palette work is spread over the workers too
+    return Image.fromarray(np.asarray(canvas.buffer_rgba())).convert("RGB").quantize()
+
+def save_rotation_gif(figsize, plot_args, gif_path, frames=90, step=4, fps=10):
+    """Render a rotating view of the 3D CMD in parallel and write it as a GIF.
+    
+    plot_args are the _draw_cmd_3d arguments; every worker redraws the figure
+    from them instead of receiving a pickled pyplot figure.
+    """
+    with ProcessPoolExecutor(initializer=_init_rotation_worker,
+                             initargs=(figsize, plot_args)) as ex:
+        images = list(ex.map(_render_rotation_frame, [i * step for i in range(frames)]))
+    
+    images[0].save(gif_path, save_all=True, append_images=images[1:],
+                   duration=int(1000 / fps), loop=0)
+
 def plot_single_cmd(logs_path="LOGS"):
     """Create Color-Magnitude Diagram for a single MESA run with evolutionary phase information"""
     
@@ -119,34 +366,41 @@ def plot_single_cmd(logs_path="LOGS"):
         return
         
     try:
-        # Load the data
-        data = mr.MesaData(history_path)
-        
         # Get filter information
         all_cols, filter_columns = read_header_columns(history_path)
+        col_set = frozenset(all_cols)
+        
+        # Load only the columns the CMD needs
+        data = load_mesa(history_path, (*_CORE_COLUMNS, *filter_columns))
         
         # Set up CMD parameters
         color_index, magnitude, color_label, mag_label, system = setup_cmd_params(data, filter_columns)
         
+        # Thinned copy of the track for the heavy scatter/line artists
+        ci, mag, keep = _decimate(color_index, magnitude)
+        
         # Create the plot
-        plt.figure(figsize=(10, 8))
+        fig = _new_figure((10, 8))
         
         # Define color mapping based on central hydrogen abundance if available
-        if hasattr(data, 'center_h1'):
+        if 'center_h1' in col_set:
+            # Bind the column once; mesa_reader resolves attributes on every access
+            h1 = np.asarray(data.center_h1)
+            hmin, hmax = h1.min(), h1.max()
+            
             # Create a color map based on central hydrogen abundance
-            norm = plt.Normalize(0, max(data.center_h1))
+            norm = plt.Normalize(0, hmax)
             cmap = plt.cm.viridis
             
-            # Plot with color representing evolutionary state
-            sc = plt.scatter(color_index, magnitude, 
-                        c=data.center_h1, cmap=cmap, norm=norm,
-                        s=30, alpha=0.8)
-            
-            # Add a line connecting points
-            plt.plot(color_index, magnitude, '-', color='gray', alpha=0.5, linewidth=1)
+            # Plot the track with color representing evolutionary state
+            lc = LineCollection(_track_segments(ci, mag), cmap=cmap, norm=norm,
+                                linewidth=2, alpha=0.8)
+            lc.set_array(h1[keep][:-1])
+            plt.gca().add_collection(lc)
+            plt.gca().autoscale_view()
             
             # Add a colorbar
-            cbar = plt.colorbar(sc)
+            cbar = plt.colorbar(lc)
             cbar.set_label('Central H mass fraction')
             
             # Mark evolutionary points
@@ -156,9 +410,9 @@ def plot_single_cmd(logs_path="LOGS"):
             tams_h1 = 0.001
             
             # Find indices closest to ZAMS and TAMS
-            if min(data.center_h1) < 0.1 and max(data.center_h1) > 0.6:  # Make sure we have both phases
-                zams_idx = np.abs(data.center_h1 - zams_h1).argmin()
-                tams_idx = np.abs(data.center_h1 - tams_h1).argmin()
+            if hmin < 0.1 and hmax > 0.6:  # Make sure we have both phases
+                zams_idx = _nearest_h1_index(h1, zams_h1, data.h1_decreasing)
+                tams_idx = _nearest_h1_index(h1, tams_h1, data.h1_decreasing)
                 
                 # Mark ZAMS with a star
                 plt.scatter(color_index[zams_idx], magnitude[zams_idx], 
@@ -177,7 +431,7 @@ def plot_single_cmd(logs_path="LOGS"):
                           marker='s', label='End')
         else:
             # Fallback to original coloring if no center_h1
-            plt.plot(color_index, magnitude, '-', color='blue', linewidth=2)
+            plt.plot(ci, mag, '-', color='blue', linewidth=2)
             
             # Add points for start and end of evolution
             plt.scatter(color_index[0], magnitude[0], color='green', s=100, 
@@ -205,88 +459,106 @@ def plot_single_cmd(logs_path="LOGS"):
         # Save and show
         os.makedirs("plots", exist_ok=True)
         plt.tight_layout()
-        plt.savefig("plots/cmd_diagram.png", dpi=300)
+        plt.savefig("plots/cmd_diagram.png", dpi=_DPI, pil_kwargs=PNG_KWARGS)
         print(f"Saved CMD to plots/cmd_diagram.png")
-        plt.show()
+        _show_figure(fig)
         
         # Make a 3D age plot if age info exists
-        if hasattr(data, 'star_age'):
-            fig = plt.figure(figsize=(12, 10))
-            ax = fig.add_subplot(111, projection='3d')
-            
-            age_myr = data.star_age / 1e6  # Convert to Myr
+        if 'star_age' in col_set:
+            age_myr = np.asarray(data.star_age) * 1e-6  # Convert to Myr
             
-            # Add color based on evolutionary phase if available
-            if hasattr(data, 'center_h1'):
-                points = ax.scatter(color_index, magnitude, age_myr,
-                                   c=data.center_h1, cmap=cmap, norm=norm,
-                                   s=30, alpha=0.8)
-                
-                # Connect points
-                ax.plot(color_index, magnitude, age_myr, color='gray', alpha=0.5, linewidth=1)
-                
-                # Add colorbar
-                cbar = fig.colorbar(points, ax=ax, pad=0.1)
-                cbar.set_label('Central H mass fraction')
-                
-                # Mark key evolutionary points if we have the full evolution
-                if min(data.center_h1) < 0.1 and max(data.center_h1) > 0.6:
-                    ax.scatter(color_index[zams_idx], magnitude[zams_idx], age_myr[zams_idx],
-                              marker='*', s=200, edgecolor='black', facecolor='navy',
-                              label='ZAMS')
-                    ax.scatter(color_index[tams_idx], magnitude[tams_idx], age_myr[tams_idx],
-                              marker='s', s=150, edgecolor='black', facecolor='gold',
-                              label='TAMS')
-                else:
-                    ax.scatter(color_index[0], magnitude[0], age_myr[0], 
-                             color='green', marker='o', s=100, label='Start')
-                    ax.scatter(color_index[-1], magnitude[-1], age_myr[-1], 
-                             color='red', marker='s', s=100, label='End')
+            # Mark key evolutionary points if we have the full evolution
+            if 'center_h1' in col_set and hmin < 0.1 and hmax > 0.6:
+                markers = [(color_index[zams_idx], magnitude[zams_idx], age_myr[zams_idx],
+                            dict(marker='*', s=200, edgecolor='black', facecolor='navy',
+                                 label='ZAMS')),
+                           (color_index[tams_idx], magnitude[tams_idx], age_myr[tams_idx],
+                            dict(marker='s', s=150, edgecolor='black', facecolor='gold',
+                                 label='TAMS'))]
             else:
-                ax.plot(color_index, magnitude, age_myr, color='blue', linewidth=2)
-                ax.scatter(color_index[0], magnitude[0], age_myr[0], 
-                          color='green', marker='o', s=100, label='Start')
-                ax.scatter(color_index[-1], magnitude[-1], age_myr[-1], 
-                          color='red', marker='s', s=100, label='End')
+                markers = [(color_index[0], magnitude[0], age_myr[0],
+                            dict(color='green', marker='o', s=100, label='Start')),
+                           (color_index[-1], magnitude[-1], age_myr[-1],
+                            dict(color='red', marker='s', s=100, label='End'))]
             
-            ax.set_xlabel(f"{color_label}", fontsize=14)
-            ax.set_ylabel(f"{mag_label}", fontsize=14)
-            ax.set_zlabel("Age (Myr)", fontsize=14)
-            ax.invert_yaxis()
+            # Plain arrays, so the rotation workers can redraw the same figure
+            plot_args = dict(ci=ci, mag=mag, age=age_myr[keep],
+                             h1=h1[keep] if 'center_h1' in col_set else None,
+                             hmax=hmax if 'center_h1' in col_set else None,
+                             markers=markers, color_label=color_label,
+                             mag_label=mag_label, system=system)
             
-            # For HR diagram, also invert x-axis
-            if system == "HR":
-                ax.invert_xaxis()
-                
-            ax.legend()
-            ax.set_title(f"3D {system} CMD Evolution", fontsize=16)
+            fig = _new_figure((12, 10))
+            _draw_cmd_3d(fig, **plot_args)
             
-            plt.savefig("plots/cmd_diagram_3d.png", dpi=300)
+            plt.savefig("plots/cmd_diagram_3d.png", dpi=_DPI, pil_kwargs=PNG_KWARGS)
             print(f"Saved 3D CMD to plots/cmd_diagram_3d.png")
-            plt.show()
             
             # Create rotating animation
             try:
-                from matplotlib.animation import FuncAnimation
-                
-                def animate(frame):
-                    ax.view_init(elev=20, azim=frame*4)
-                    return []
-                
-                anim = FuncAnimation(fig, animate, frames=90, interval=100, blit=False)
-                anim.save("plots/cmd_diagram_3d_rotation.gif", writer='pillow', fps=10)
+                save_rotation_gif((12, 10), plot_args, "plots/cmd_diagram_3d_rotation.gif")
                 print(f"Saved rotating 3D CMD to plots/cmd_diagram_3d_rotation.gif")
             except ImportError:
                 print("Could not create animation (pillow not available)")
             except Exception as e:
                 print(f"Could not create animation: {e}")
             
+            _show_figure(fig)
+            
         return True
         
     except Exception as e:
         print(f"Error creating CMD: {e}")
         return False
 
+def _load_run(run_dir, history_path):
+    """Load one batch run and compute its CMD arrays (runs in a worker process)."""
+    if not os.path.exists(history_path):
+        print(f"Warning: No history file in {run_dir}")
+        return None
+        
+    try:
+        # Parse parameters from directory name
+        params = parse_run_name(run_dir)
+        if params is None:
+            raise ValueError(f"unrecognised run directory name '{run_dir}'")
+        mass, metallicity = params['mass'], params['metallicity']
+        scheme, fov = params['scheme'], params['fov']
+            
+        # Get filter information
+        all_cols, filter_columns = read_header_columns(history_path)
+        col_set = frozenset(all_cols)
+        
+        # Load only the columns the CMD needs
+        data = load_mesa(history_path, (*_CORE_COLUMNS, *filter_columns))
+        
+        # Set up CMD parameters (use same logic for all)
+        color_index, magnitude, color_label, mag_label, system = setup_cmd_params(data, filter_columns)
+        
+        # Only thinned arrays go back to the main process, not the whole history
+        has_age = 'star_age' in col_set
+        color_index, magnitude, keep = _decimate(color_index, magnitude)
+        age_myr = np.asarray(data.star_age)[keep] * 1e-6 if has_age else None
+        
+        return {
+            'mass': mass,
+            'metallicity': metallicity,
+            'scheme': scheme,
+            'fov': fov,
+            'color_index': color_index,
+            'magnitude': magnitude,
+            'age_myr': age_myr,
+            'color_label': color_label,
+            'mag_label': mag_label,
+            'system': system,
+            'run_dir': run_dir,
+            'has_age': has_age
+        }
+            
+    except Exception as e:
+        print(f"Error processing {run_dir}: {e}")
+        return None
+
 def plot_batch_cmds():
     """Create CMD plots for batch runs"""
     
@@ -296,75 +568,31 @@ def plot_batch_cmds():
         return False
         
     # Find all run directories
-    run_dirs = [d for d in os.listdir(runs_dir) 
-                if os.path.isdir(os.path.join(runs_dir, d)) and d.startswith("inlist_")]
+    run_dirs = find_run_dirs(runs_dir)
+    history_paths = [os.path.join(runs_dir, d, "LOGS", "history.data") for d in run_dirs]
     
     if not run_dirs:
         print("No batch run directories found")
         return False
         
-    # Parse run parameters and collect data
-    all_data = []
-    colors_mass = {}
-    linestyles_scheme = {}
+    # Load every run in parallel; plotting stays on the main process
+    with ProcessPoolExecutor() as ex:
+        results = list(ex.map(_load_run, run_dirs, history_paths))
     
-    for run_dir in run_dirs:
-        history_path = os.path.join(runs_dir, run_dir, "LOGS", "history.data")
-        
-        if not os.path.exists(history_path):
-            print(f"Warning: No history file in {run_dir}")
-            continue
-            
-        try:
-            # Parse parameters from directory name
-            parts = run_dir.replace('inlist_M', '').split('_')
-            mass = float(parts[0])
-            metallicity = float(parts[1][1:])  # Remove 'Z'
-            
-            if 'noovs' in run_dir:
-                scheme = 'none'
-                fov = 0.0
-            else:
-                scheme = parts[2]
-                fov = float(parts[3][3:])  # Remove 'fov'
-                
-            # Load data
-            data = mr.MesaData(history_path)
-            
-            # Get filter information
-            all_cols, filter_columns = read_header_columns(history_path)
-            
-            # Set up CMD parameters (use same logic for all)
-            color_index, magnitude, color_label, mag_label, system = setup_cmd_params(data, filter_columns)
-            
-            # Store data
-            run_info = {
-                'data': data,
-                'mass': mass,
-                'metallicity': metallicity,
-                'scheme': scheme,
-                'fov': fov,
-                'color_index': color_index,
-                'magnitude': magnitude,
-                'color_label': color_label,
-                'mag_label': mag_label,
-                'system': system,
-                'run_dir': run_dir
-            }
-            all_data.append(run_info)
-            
-            # Assign colors by mass
-            if mass not in colors_mass:
-                colors_mass[mass] = plt.cm.viridis(len(colors_mass) / 10.0)
-                
-            # Assign line styles by scheme
-            if scheme not in linestyles_scheme:
-                styles = ['-', '--', '-.', ':']
-                linestyles_scheme[scheme] = styles[len(linestyles_scheme) % len(styles)]
-                
-        except Exception as e:
-            print(f"Error processing {run_dir}: {e}")
-            continue
+    all_data = [run_info for run_info in results if run_info is not None]
+    
+    # Assign colors by mass rank, sampling the colormap once for all masses
+    masses = sorted({run_info['mass'] for run_info in all_data})
+    palette = plt.cm.viridis(np.linspace(0, 0.9, len(masses)))
+    colors_mass = {mass: palette[rank] for rank, mass in enumerate(masses)}
+    
+    # Assign line styles by scheme
+    linestyles_scheme = {}
+    styles = ['-', '--', '-.', ':']
+    for run_info in all_data:
+        scheme = run_info['scheme']
+        if scheme not in linestyles_scheme:
+            linestyles_scheme[scheme] = styles[len(linestyles_scheme) % len(styles)]
     
     if not all_data:
         print("No valid data found in batch runs")
@@ -379,7 +607,12 @@ def plot_batch_cmds():
     print(f"Found {len(primary_data)} models with {primary_system} photometry")
     
     # Create batch CMD plot
-    plt.figure(figsize=(12, 10))
+    fig = _new_figure((12, 10))
+    
+    # Start/end markers are gathered here and drawn in two scatter calls
+    starts = []
+    ends = []
+    marker_colors = []
     
     for run_info in primary_data:
         color = colors_mass[run_info['mass']]
@@ -393,11 +626,16 @@ def plot_batch_cmds():
                 color=color, linestyle=linestyle, linewidth=2, 
                 label=label, alpha=0.8)
         
-        # Mark start and end points
-        plt.scatter(run_info['color_index'][0], run_info['magnitude'][0], 
-                   color=color, marker='o', s=50, alpha=0.7)
-        plt.scatter(run_info['color_index'][-1], run_info['magnitude'][-1], 
-                   color=color, marker='s', s=50, alpha=0.7)
+        starts.append((run_info['color_index'][0], run_info['magnitude'][0]))
+        ends.append((run_info['color_index'][-1], run_info['magnitude'][-1]))
+        marker_colors.append(color)
+    
+    # Mark start and end points
+    starts = np.asarray(starts)
+    ends = np.asarray(ends)
+    marker_colors = np.asarray(marker_colors)
+    plt.scatter(starts[:, 0], starts[:, 1], c=marker_colors, marker='o', s=50, alpha=0.7)
+    plt.scatter(ends[:, 0], ends[:, 1], c=marker_colors, marker='s', s=50, alpha=0.7)
     
     plt.xlabel(f"{primary_data[0]['color_label']}", fontsize=14)
     plt.ylabel(f"{primary_data[0]['mag_label']}", fontsize=14)
@@ -412,21 +650,19 @@ def plot_batch_cmds():
     
     os.makedirs("plots", exist_ok=True)
     plt.tight_layout()
-    plt.savefig("plots/all_cmd_diagrams.png", dpi=300, bbox_inches='tight')
+    plt.savefig("plots/all_cmd_diagrams.png", dpi=_DPI, pil_kwargs=PNG_KWARGS, bbox_inches='tight')
     print(f"Saved batch CMD to plots/all_cmd_diagrams.png")
-    plt.show()
+    _show_figure(fig)
     
     # Create 3D batch plot
-    if all(hasattr(d['data'], 'star_age') for d in primary_data):
-        fig = plt.figure(figsize=(14, 10))
+    if all(d['has_age'] for d in primary_data):
+        fig = _new_figure((14, 10))
         ax = fig.add_subplot(111, projection='3d')
         
         for run_info in primary_data:
             color = colors_mass[run_info['mass']]
-            age_myr = run_info['data'].star_age / 1e6
-            
-            ax.plot(run_info['color_index'], run_info['magnitude'], age_myr,
-                   color=color, linewidth=2, alpha=0.8,
+            ax.plot(run_info['color_index'], run_info['magnitude'], run_info['age_myr'],
+                   color=color, linewidth=2, alpha=0.8, rasterized=True,
                    label=f"M={run_info['mass']}M☉")
         
         ax.set_xlabel(f"{primary_data[0]['color_label']}", fontsize=14)
@@ -440,9 +676,9 @@ def plot_batch_cmds():
         ax.legend()
         ax.set_title(f"3D Batch {primary_system} CMD Evolution", fontsize=16)
         
-        plt.savefig("plots/all_cmd_diagrams_3d.png", dpi=300, bbox_inches='tight')
+        plt.savefig("plots/all_cmd_diagrams_3d.png", dpi=_DPI, pil_kwargs=PNG_KWARGS, bbox_inches='tight')
         print(f"Saved 3D batch CMD to plots/all_cmd_diagrams_3d.png")
-        plt.show()
+        _show_figure(fig)
     
     return True
 
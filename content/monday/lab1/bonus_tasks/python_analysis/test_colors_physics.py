@@ -0,0 +1,21 @@
+import colors_physics
+
+
+def test_read_header_columns_past_first_64k(tmp_path):
+    # Long filter names push the column-name line across the 64 KiB read
+    names = ["model_number", "star_age", "Flux_bol"] + [f"F{i}_" + "x" * 80 for i in range(900)]
+    history = tmp_path / "history.data"
+    history.write_text("\n".join([
+        "1 2 3",
+        "version_number",
+        "1",
+        "",
+        "1 2 3",
+        " ".join(names),
+        " ".join(["1"] * len(names)),
+    ]) + "\n")
+
+    all_cols, filter_columns = colors_physics.read_header_columns(str(history))
+
+    assert all_cols == names
+    assert filter_columns[-1] == names[-1]
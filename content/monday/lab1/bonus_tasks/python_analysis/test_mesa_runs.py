@@ -0,0 +1,43 @@
+import mesa_runs
+
+
+def test_parse_run_name_full():
+    assert mesa_runs.parse_run_name("inlist_M1.5_Z0.02_exponential_fov0.016") == {
+        "mass": 1.5,
+        "metallicity": 0.02,
+        "scheme": "exponential",
+        "fov": 0.016,
+    }
+
+
+def test_parse_run_name_noovs():
+    params = mesa_runs.parse_run_name("inlist_M3_Z0.014_noovs")
+
+    assert params["scheme"] == "none"
+    assert params["fov"] == 0.0
+
+
+def test_parse_run_name_defaults():
+    # Z, scheme and f_ov may all be left out of the name
+    assert mesa_runs.parse_run_name("inlist_M2.0") == {
+        "mass": 2.0,
+        "metallicity": 0.014,
+        "scheme": "unknown",
+        "fov": 0.0,
+    }
+    assert mesa_runs.parse_run_name("inlist_M2.0_step")["scheme"] == "step"
+
+
+def test_parse_run_name_unparseable():
+    assert mesa_runs.parse_run_name("inlist_Mx") is None
+    assert mesa_runs.parse_run_name("LOGS") is None
+
+
+def test_find_run_dirs(tmp_path, capsys):
+    for name in ("inlist_M1.0_Z0.014_noovs", "inlist_M2.0", "inlist_Mbad", "LOGS"):
+        (tmp_path / name).mkdir()
+    # A file with a run-like name isn't a run directory
+    (tmp_path / "inlist_M3.0").write_text("")
+
+    assert sorted(mesa_runs.find_run_dirs(str(tmp_path))) == ["inlist_M1.0_Z0.014_noovs", "inlist_M2.0"]
+    assert "inlist_Mbad" in capsys.readouterr().out